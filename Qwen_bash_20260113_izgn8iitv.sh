@@ -1,2 +1,2 @@
-pip install flask
-python app.py
\ No newline at end of file
+pip install flask gunicorn
+gunicorn -c gunicorn.conf.py wsgi:app
\ No newline at end of file
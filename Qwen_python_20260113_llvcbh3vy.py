@@ -1,38 +1,70 @@
-from flask import Flask, render_template_string, request, redirect, url_for, session
+from flask import Flask, Blueprint, Response, current_app, g, jsonify, render_template, request, redirect, url_for, session
+from jinja2 import DictLoader
 # from pyngrok import ngrok  # <-- SUPPRIME CETTE LIGNE
-import hashlib, json, os, random
-
-app = Flask(__name__)
-app.secret_key = "pokemon_secret_CHANGE_IN_PROD"
+import copy, hashlib, json, os, threading, time
+from contextlib import contextmanager
+from user_store import UserStore
+from session_store import ServerSessionInterface, make_backend
+from saver import WriteBehindSaver
+from storage import atomic_write_bytes, locked
+from save_format import EXTENSIONS, SaveCodec, is_binary
+from save_layout import SaveIndex, ShardedLayout, start_migration
+from leaderboard import BOARDS, Leaderboard
+from cache import LRUCache
+from passwords import PasswordHasher
+import combat as engine
+from rng import CounterRNG
+import game_data
+from compression import compress_response, precompress, serve_precompressed
+import events as game_events
+from metrics import Metrics
 
 # ================== CONFIG ==================
-USERS_FILE = "pokemon_users.json"
-SAVES_DIR = "pokemon_saves"
-os.makedirs(SAVES_DIR, exist_ok=True)
+# Valeurs par défaut, surchargeables par variables d'environnement ou create_app(config)
+DEFAULT_CONFIG = {
+    "SECRET_KEY": os.environ.get("POKEMON_SECRET_KEY", "pokemon_secret_CHANGE_IN_PROD"),
+    "USERS_FILE": "pokemon_users.json",  # ancien format, migré vers USERS_DB au démarrage
+    "USERS_DB": "pokemon_users.db",
+    "SAVES_DIR": "pokemon_saves",
+    # "json" (lisible) | "binary" (compact, voir save_format.py) ; l'autre format reste lu
+    "SAVE_FORMAT": os.environ.get("POKEMON_SAVE_FORMAT", "json"),
+    # L'état de jeu vit côté serveur ; le cookie ne porte que l'id de session
+    "SESSION_BACKEND": os.environ.get("POKEMON_SESSION_BACKEND", "sqlite"),  # "memory" | "sqlite"
+    "SESSIONS_DB": "pokemon_sessions.db",
+    # Sauvegarde en arrière-plan des états modifiés (secondes / nb de joueurs en attente)
+    "SAVE_INTERVAL": float(os.environ.get("POKEMON_SAVE_INTERVAL", 5)),
+    "SAVE_BATCH": int(os.environ.get("POKEMON_SAVE_BATCH", 100)),
+    # Journal d'événements (SAVES_DIR/events) : compacté dans l'archive au-delà de cette taille (octets)
+    "EVENT_LOG_COMPACT_BYTES": int(os.environ.get("POKEMON_EVENT_LOG_COMPACT_BYTES", 64 * 1024)),
+    # Cache LRU des sauvegardes lues (nb d'entrées, TTL en secondes ou None = pas d'expiration)
+    "SAVE_CACHE_SIZE": int(os.environ.get("POKEMON_SAVE_CACHE_SIZE", 1024)),
+    "SAVE_CACHE_TTL": float(os.environ["POKEMON_SAVE_CACHE_TTL"]) if os.environ.get("POKEMON_SAVE_CACHE_TTL") else None,
+    # Coût PBKDF2 des mots de passe (les hash existants sont mis à jour au login)
+    "PASSWORD_ITERATIONS": int(os.environ.get("POKEMON_PASSWORD_ITERATIONS", 200_000)),
+    # Compression gzip/brotli des réponses à partir de cette taille (octets)
+    "COMPRESS_MIN_SIZE": int(os.environ.get("POKEMON_COMPRESS_MIN_SIZE", 500)),
+    # Pages sans état (accueil, login, inscription, au revoir) rendues dès le démarrage, pour chaque langue
+    "PRERENDER_PAGES": os.environ.get("POKEMON_PRERENDER_PAGES", "1") == "1",
+    # Processus workers (voir gunicorn.conf.py) : au-delà de 1, le backend de session doit être partagé
+    "WORKERS": int(os.environ.get("POKEMON_WORKERS", 1)),
+    # Mode ASGI (asgi.py) : threads exécutant les vues, et requêtes admises au-delà desquelles on répond 503
+    "ASGI_THREADS": int(os.environ.get("POKEMON_ASGI_THREADS", 16)),
+    "ASGI_MAX_PENDING": int(os.environ.get("POKEMON_ASGI_MAX_PENDING", 1024)),
+}
+# Métriques (voir /metrics) : durée des phases internes, par phase
+PHASE_METRIC = "pokemon_phase_duration_seconds"
+# Combat auto : le Pokémon se soigne sous ce pourcentage de PV, sinon attaque
+AUTO_HEAL_BELOW = 30
 
 # ================== DATA ==================
-bosses = [
-    {"nom": "Nerkael", "pokemon": ["Pikachu", "Évoli"], "recompense": 150, "niveau": 3},
-    {"nom": "Ignivor", "pokemon": ["Lucario", "Dracolosse"], "recompense": 300, "niveau": 5},
-    {"nom": "Aquarion", "pokemon": ["Metalosse", "Tyranocif"], "recompense": 500, "niveau": 8},
-    {"nom": "Terragon", "pokemon": ["Dracaufeu", "Mew"], "recompense": 1000, "niveau": 12},
-    {"nom": "Pyrodraco", "pokemon": ["Dracaufeu", "Mew"], "recompense": 1000000, "niveau": 20}
-]
-
-pokemon_stats = {
-    "Pikachu": {"pv": 100, "attaque": 30, "rarete": "Commun"},
-    "Évoli": {"pv": 120, "attaque": 25, "rarete": "Commun"},
-    "Lucario": {"pv": 130, "attaque": 35, "rarete": "Rare"},
-    "Dracolosse": {"pv": 150, "attaque": 40, "rarete": "Rare"},
-    "Metalosse": {"pv": 140, "attaque": 45, "rarete": "Épique"},
-    "Tyranocif": {"pv": 150, "attaque": 50, "rarete": "Épique"},
-    "Dracaufeu": {"pv": 160, "attaque": 45, "rarete": "Mythique"},
-    "Mew": {"pv": 170, "attaque": 50, "rarete": "Mythique"}
-}
+# Tables figées et indexées (game_data.py) ; POKEMON_GAME_DATA = fichier JSON/TOML qui les remplace
+GAME = game_data.load(os.environ.get("POKEMON_GAME_DATA"))
 
-PRIX_VENTE = {"Commun": 40, "Rare": 120, "Épique": 300, "Mythique": 800}
-BONUS_ATK = {"Commun": 0, "Rare": 5, "Épique": 12, "Mythique": 25}
 MAX_EQUIPE = 6
+PRIX_BOOSTER = 50
+PRIX_SOIN = 30
+# Sauvegardes binaires : espèces et raretés stockées par indice (ajouter en fin seulement)
+save_codec = SaveCodec([s.nom for s in GAME.species], GAME.rarities)
 
 LANGUES = {
     "fr": {"welcome": "Salut {nom}", "login": "Se connecter", "register": "Créer un compte", 
@@ -40,52 +72,353 @@ LANGUES = {
            "collection": "📋 Collection", "sell": "💸 Vendre", "heal_team": "❤️ Soigner (30€)",
            "save": "💾 Sauvegarder", "quit": "🚪 Quitter", "back": "← Retour",
            "money": "Argent", "boss_progress": "Boss vaincus", "choose_pokemon": "Choisis ton Pokémon",
-           "attack": "Attaquer", "heal": "Soigner", "victory": "🏆 VICTOIRE", "defeat": "💀 Défaite"},
+           "attack": "Attaquer", "heal": "Soigner", "victory": "🏆 VICTOIRE", "defeat": "💀 Défaite",
+           "auto": "🤖 Combat auto", "leaderboard": "🏅 Classement", "power": "Puissance"},
     "en": {"welcome": "Hello {nom}", "login": "Login", "register": "Create account",
            "menu": "Menu", "fight": "⚔️ Fight", "booster": "🎁 Booster (50€)",
            "collection": "📋 Collection", "sell": "💸 Sell", "heal_team": "❤️ Heal (30€)",
            "save": "💾 Save", "quit": "🚪 Quit", "back": "← Back",
            "money": "Money", "boss_progress": "Bosses defeated", "choose_pokemon": "Choose Pokémon",
-           "attack": "Attack", "heal": "Heal", "victory": "🏆 VICTORY", "defeat": "💀 Defeat"},
+           "attack": "Attack", "heal": "Heal", "victory": "🏆 VICTORY", "defeat": "💀 Defeat",
+           "auto": "🤖 Auto-battle", "leaderboard": "🏅 Leaderboard", "power": "Power"},
     "ru": {"welcome": "Привет {nom}", "login": "Войти", "register": "Создать аккаунт",
            "menu": "Меню", "fight": "⚔️ Сразиться", "booster": "🎁 Бустер (50€)",
            "collection": "📋 Коллекция", "sell": "💸 Продать", "heal_team": "❤️ Лечить (30€)",
            "save": "💾 Сохранить", "quit": "🚪 Выйти", "back": "← Назад",
            "money": "Деньги", "boss_progress": "Побеждено", "choose_pokemon": "Выбери покемона",
-           "attack": "Атаковать", "heal": "Лечить", "victory": "🏆 ПОБЕДА", "defeat": "💀 Поражение"}
+           "attack": "Атаковать", "heal": "Лечить", "victory": "🏆 ПОБЕДА", "defeat": "💀 Поражение",
+           "auto": "🤖 Автобой", "leaderboard": "🏅 Рейтинг", "power": "Сила"}
 }
+# Version des traductions de chaque langue (invalide les pages prérendues qui les utilisent)
+LANG_DIGESTS = {lang: hashlib.sha256(json.dumps(T, sort_keys=True).encode()).hexdigest() for lang, T in LANGUES.items()}
 
 # ================== UTILS ==================
+class Backends:
+    """Stockages d'une instance de l'app (un jeu par processus worker, aucun global)."""
+
+    def __init__(self, config):
+        self.metrics = Metrics()
+        self.saves_dir = config["SAVES_DIR"]
+        self.save_format = config["SAVE_FORMAT"]
+        if self.save_format not in EXTENSIONS:
+            raise ValueError(f"Format de sauvegarde inconnu: {self.save_format!r}")
+        # Fichiers rangés par hash du nom de joueur (voir save_layout.py) ; l'ancien
+        # dossier plat reste lu jusqu'à ce que la migration de fond l'ait vidé
+        self.layout = ShardedLayout(self.saves_dir)
+        self.save_suffixes = set(EXTENSIONS.values())
+        self.legacy = True
+        self.locks_dir = os.path.join(self.saves_dir, ".locks")
+        self.lock_layout = ShardedLayout(self.locks_dir)
+        os.makedirs(self.locks_dir, exist_ok=True)
+        self.index = SaveIndex(os.path.join(self.saves_dir, "index.db"))
+        self.leaderboard = Leaderboard(os.path.join(self.saves_dir, "leaderboard.db"))
+        # Chaque action est journalisée ; les sauvegardes ne sont plus que des instantanés
+        self.events = game_events.EventLog(os.path.join(self.saves_dir, "events"), config["EVENT_LOG_COMPACT_BYTES"])
+        self.hasher = PasswordHasher(config["PASSWORD_ITERATIONS"])
+        self.users = UserStore(config["USERS_DB"])
+        self.users.migrate_json(config["USERS_FILE"])
+        # Le cache garde l'état décodé (journal rejoué) avec ce qui l'a produit : chemin et
+        # mtime de la sauvegarde, version du journal. Une sauvegarde ou un événement écrit
+        # entre-temps, par ce worker ou un autre, invalide l'entrée ; chaque lecture rend une copie
+        self.save_cache = LRUCache(config["SAVE_CACHE_SIZE"], config["SAVE_CACHE_TTL"])
+        self.pages = {}  # pages sans état prérendues (voir cached_page) : clé -> (version, variantes compressées)
+        self.saver = WriteBehindSaver(self.write_save, interval=config["SAVE_INTERVAL"],
+                                      threshold=config["SAVE_BATCH"]).start()
+        self.metrics.describe(PHASE_METRIC, "Durée des phases internes (chargement, sauvegarde, rendu...)")
+        self.metrics.gauge(self.storage_gauges)
+        self.migration = start_migration(self)
+
+    def phase(self, name):
+        return self.metrics.timer(PHASE_METRIC, phase=name)
+
+    def storage_gauges(self):
+        cache = self.save_cache.stats()
+        yield "pokemon_save_cache_hits", {}, cache["hits"]
+        yield "pokemon_save_cache_misses", {}, cache["misses"]
+        yield "pokemon_save_cache_entries", {}, cache["size"]
+        yield "pokemon_saves_pending", {}, self.saver.pending_count()
+
+    def lock(self, user):
+        return locked(self.lock_layout.path(user, ".lock", create=True))
+
+    def record_event(self, user, event):
+        stamp = time.time_ns()
+        with self.lock(user):
+            self.events.append(user, stamp, event)
+
+    def save_path(self, user, fmt=None, create=False):
+        return self.layout.path(user, EXTENSIONS[fmt or self.save_format], create)
+
+    def find_save(self, user):
+        """(chemin, mtime) de la sauvegarde, au format configuré sinon à l'autre ; (None, None) si aucune."""
+        formats = sorted(EXTENSIONS, key=lambda fmt: fmt != self.save_format)
+        candidates = [self.save_path(user, fmt) for fmt in formats]
+        if self.legacy:
+            candidates += [os.path.join(self.saves_dir, user + EXTENSIONS[fmt]) for fmt in formats]
+        for f in candidates:
+            try:
+                return f, os.stat(f).st_mtime_ns
+            except FileNotFoundError:
+                pass
+        return None, None
+
+    def read_save(self, user, lazy=False):
+        with self.phase("load_game"):
+            return self._read_save(user, lazy)
+
+    def write_save(self, user, data, stamp):
+        with self.phase("save_game"):
+            self._write_save(user, data, stamp)
+
+    def _read_save(self, user, lazy):
+        """État du joueur : dernier instantané + événements journalisés depuis. lazy=True rend
+        une vue en lecture seule qui ne décode une sauvegarde binaire qu'à la demande
+        (argent / boss_actuel sans la collection), s'il n'y a rien à rejouer."""
+        pending = self.saver.pending(user)
+        if pending is not None:
+            return copy.deepcopy(pending)  # l'original appartient au saver
+        cached = self.save_cache.get(user)
+        if cached is not None and self._cache_valid(user, *cached[:3]):
+            return copy.deepcopy(cached[3])  # deux stat, ni verrou ni décodage
+        # Instantané et suite du journal lus sous le verrou : une sauvegarde écrite entre les
+        # deux par un autre worker ferait rejouer des événements qu'elle contient déjà
+        with self.lock(user):
+            version = self.events.version(user)
+            f, mtime = self.find_save(user)
+            tail = self.events.read(user, after=mtime or 0)
+            if f is None:
+                state = game_events.apply({"argent": 150, "collection": [], "boss_actuel": 0}, tail)
+            else:
+                with open(f, 'rb') as fh:
+                    blob = fh.read()
+                if lazy and not tail and is_binary(blob):
+                    return save_codec.decode(blob)  # vue paresseuse : pas mise en cache
+                state = game_events.apply(save_codec.loads(blob), tail)
+        self.save_cache.set(user, (f, mtime, version, copy.deepcopy(state)))
+        return state
+
+    def _cache_valid(self, user, f, mtime, version):
+        if f is None:
+            if self.find_save(user)[0] is not None:
+                return False
+        else:
+            try:
+                if os.stat(f).st_mtime_ns != mtime:
+                    return False
+            except FileNotFoundError:
+                return False
+        return self.events.version(user) == version
+
+    def _write_save(self, user, data, stamp):
+        # stamp = instant (ns) où l'état a été produit, conservé comme mtime du fichier :
+        # entre workers, un état plus ancien n'écrase jamais un plus récent.
+        # Le verrou par joueur rend ce test + écriture atomique entre processus.
+        fmt = self.save_format
+        try:
+            blob = save_codec.dumps(data, fmt)
+        except ValueError:
+            fmt = "json"  # état hors du format binaire (champ inconnu...) : repli lisible
+            blob = save_codec.dumps(data, fmt)
+        f = self.save_path(user, fmt, create=True)
+        with self.lock(user):
+            existing, mtime = self.find_save(user)
+            if mtime is not None and mtime > stamp:
+                return
+            atomic_write_bytes(f, blob)
+            os.utime(f, ns=(stamp, stamp))
+            if existing not in (None, f):
+                os.remove(existing)  # un seul fichier par joueur, quel que soit le format
+            self.events.compact(user, stamp)
+        self.index.add(user)
+        # Des événements postérieurs à `stamp` peuvent déjà être journalisés : relu au besoin
+        self.save_cache.invalidate(user)
+        self.leaderboard.publish(user, data, stamp)
+
+    def rebuild_leaderboard(self):
+        """Classement recalculé depuis toutes les sauvegardes (après la migration des fichiers plats)."""
+        self.migration.join()
+        return self.leaderboard.rebuild(self.index.users(), lambda user: self.read_save(user, lazy=True))
+
+def backends():
+    return current_app.extensions["pokemon"]
+
 def hash_pw(pw):
-    return hashlib.sha256(pw.encode()).hexdigest()
+    return backends().hasher.hash(pw)
 
 def load_users():
-    return json.load(open(USERS_FILE, encoding='utf-8')) if os.path.exists(USERS_FILE) else {}
+    return backends().users
 
 def save_users(u):
-    json.dump(u, open(USERS_FILE, 'w', encoding='utf-8'), ensure_ascii=False, indent=2)
+    # Les écritures via load_users() sont déjà persistées ligne par ligne
+    users = backends().users
+    if u is not users:
+        users.update(u)
 
 def load_game(user):
-    f = os.path.join(SAVES_DIR, f"{user}.json")
-    return json.load(open(f, encoding='utf-8')) if os.path.exists(f) else {"argent": 150, "collection": [], "boss_actuel": 0}
+    return backends().read_save(user)
 
 def save_game(user, data):
-    json.dump(data, open(os.path.join(SAVES_DIR, f"{user}.json"), 'w', encoding='utf-8'), ensure_ascii=False, indent=2)
+    backends().write_save(user, data, time.time_ns())
 
 def get_state():
     if 'username' not in session or 'game_state' not in session:
         session['game_state'] = load_game(session.get('username', ''))
     return session['game_state']
 
-def update_state(updates):
+def int_arg(source, key, default):
+    """Entier lu dans un formulaire, un corps JSON ou la query string ; GameError("bad_param") si illisible."""
+    try:
+        return int(source.get(key, default))
+    except (TypeError, ValueError):
+        raise GameError("bad_param") from None
+
+def update_state(updates, event=None):
+    """`event` : l'action journalisée (voir events.py), enregistrée avant de marquer l'état sale."""
     state = get_state()
     state.update(updates)
     session['game_state'] = state
     session.modified = True
+    if 'username' in session:
+        if event is not None:
+            backends().record_event(session['username'], event)
+        backends().leaderboard.update(session['username'], state)
+        backends().saver.mark_dirty(session['username'], state)
+
+# ================== GAME LOGIC ==================
+# Partagée par les pages HTML et l'API JSON. Une action refusée lève
+# GameError avec un code ("no_money", "team_full"...) que chaque interface traduit.
+class GameError(Exception):
+    pass
+
+@contextmanager
+def player_rng():
+    """Flux aléatoire du joueur (boosters, seeds des combats), repris depuis la session puis rangé."""
+    rng = CounterRNG(*session.get('rng', ()))
+    yield rng
+    session['rng'] = [rng.seed_value, rng.counter]
+
+def authenticate(user, pw):
+    users, hasher = load_users(), backends().hasher
+    with backends().phase("load_users"):
+        record = users.get(user)
+    if not record:
+        return False
+    with backends().phase("password_verify"):
+        if not hasher.verify(record["password"], pw):
+            return False
+    if hasher.needs_rehash(record["password"]):
+        users[user] = {**record, "password": hash_pw(pw)}
+    session.regenerate()  # pas de fixation de session : nouvel identifiant une fois connecté
+    session['username'] = user
+    session['game_state'] = load_game(user)
+    return True
+
+def register(user, pw):
+    return load_users().add(user, {"password": hash_pw(pw)})
+
+def draw_pokemon(rng):
+    return GAME.booster.draw(rng)
+
+def open_boosters(state, rng, count=1):
+    """Ouvre `count` boosters d'un coup : tous ou aucun (argent et place vérifiés avant)."""
+    if count < 1:
+        raise GameError("bad_count")
+    if state['argent'] < PRIX_BOOSTER * count:
+        raise GameError("no_money")
+    if len(state['collection']) + count > MAX_EQUIPE:
+        raise GameError("team_full")
+    state['argent'] -= PRIX_BOOSTER * count
+    new_pkms = [{"nom": s.nom, "pv": s.pv, "pv_max": s.pv, "attaque": s.booster_atk,
+                 "rarete": s.rarete, "niveau": 1, "xp": 0} for s in GAME.booster.draw_many(count, rng)]
+    state['collection'].extend(new_pkms)
+    update_state(state, {"e": "booster", "argent": state['argent'], "added": new_pkms,
+                         "collection": state['collection']})
+    return new_pkms
+
+def sell_pokemon(state, idx):
+    # Vendre décalerait les indices de l'équipe, dont celui du Pokémon en combat
+    if 'combat' in session:
+        raise GameError("fight_in_progress")
+    if not 0 <= idx < len(state['collection']):
+        raise GameError("bad_index")
+    pkm = state['collection'].pop(idx)
+    prix = GAME.by_name[pkm['nom']].prix_vente
+    state['argent'] += prix
+    update_state(state, {"e": "sell", "idx": idx, "argent": state['argent'], "collection": state['collection']})
+    return pkm, prix
+
+def heal_all(state):
+    if state['argent'] < PRIX_SOIN:
+        raise GameError("no_money")
+    state['argent'] -= PRIX_SOIN
+    for p in state['collection']:
+        p['pv'] = p['pv_max']
+    update_state(state, {"e": "heal_team", "argent": state['argent']})
+
+def start_fight(state, pokemon_idx, rng):
+    """Démarre un combat avec le pokemon_idx-ième Pokémon encore debout."""
+    if state['boss_actuel'] >= len(GAME.bosses):
+        raise GameError("all_bosses_defeated")
+    available = [i for i, p in enumerate(state['collection']) if p['pv'] > 0]
+    if not 0 <= pokemon_idx < len(available):
+        raise GameError("bad_index")
+    idx = available[pokemon_idx]
+    combat = engine.start(GAME.bosses[state['boss_actuel']], state['collection'][idx], idx, rng.getrandbits(64))
+    session['combat'] = combat.to_dict()
+    return combat
+
+def public_fight():
+    return engine.CombatState.from_dict(session['combat']).public_dict() if 'combat' in session else None
+
+def current_fight():
+    if 'combat' not in session:
+        raise GameError("no_fight")
+    return engine.CombatState.from_dict(session['combat'])
+
+FIGHT_ACTIONS = ("attack", "heal", "auto")
+
+def play_turn(state, combat, action, heal_below=AUTO_HEAL_BELOW):
+    """Joue un tour, ou tout le combat si action == "auto". Retourne les nouvelles lignes du journal."""
+    if combat.finished:
+        raise GameError("fight_over")  # double envoi après la fin : l'issue reste acquise
+    if action not in FIGHT_ACTIONS:
+        raise GameError("bad_param")
+    start = len(combat.log)
+    with backends().phase("combat"):
+        engine.act(combat, action, heal_below / 100 if action == "auto" else None)
+    new_lines = combat.log[start:]
+    if action != "auto":
+        combat.log = combat.log[-engine.LOG_SIZE:]
+    state['collection'][combat.pokemon_idx]['pv'] = combat.pv
+    session['combat'] = combat.to_dict()
+    update_state(state, {"e": "fight_turn", "idx": combat.pokemon_idx, "action": action, "pv": combat.pv})
+    return new_lines
+
+def settle_fight(state, combat):
+    if not combat.finished:
+        raise GameError("fight_not_over")
+    boss = GAME.bosses[state['boss_actuel']]
+    is_victory, gain = engine.finish(combat, state['collection'][combat.pokemon_idx], boss)
+    state['argent'] += gain
+    if is_victory:
+        state['boss_actuel'] += 1
+    # "record" : de quoi rejouer le combat à l'identique (python combat.py <joueur>), conservé dans l'archive
+    update_state(state, {"e": "fight_result", "idx": combat.pokemon_idx, "won": is_victory, "gain": gain,
+                         "argent": state['argent'], "boss_actuel": state['boss_actuel'],
+                         "pokemon": state['collection'][combat.pokemon_idx], "record": combat.record()})
+    # Nettoyer la session du combat
+    session.pop('combat', None)
+    return is_victory, gain
+
+def request_save():
+    saver = backends().saver
+    saver.mark_dirty(session['username'], get_state())
+    saver.request_flush()
 
 # ================== STYLES ==================
-BASE_STYLE = """
-<style>
+# Servie comme feuille statique versionnée par hash du contenu (cache immuable
+# navigateur / CDN) ; les pages ne font que la référencer.
+STYLE_CSS = """
 * { margin: 0; padding: 0; box-sizing: border-box; }
 body {
     font-family: 'Segoe UI', Tahoma, sans-serif;
@@ -154,17 +487,100 @@ input {
 }
 .msg-success { background: #d4edda; color: #155724; }
 .msg-error { background: #f8d7da; color: #721c24; }
-</style>
 """
+STYLE_HASH = hashlib.sha256(STYLE_CSS.encode()).hexdigest()[:16]
+BASE_STYLE = """<link rel="stylesheet" href="{{url_for('stylesheet', digest=STYLE_HASH)}}">
+"""
+
+# ================== TEMPLATES ==================
+# Les pages sont enregistrées par nom et compilées une seule fois par Jinja
+# (cache de l'environnement) au lieu d'être reparsées à chaque requête.
+PAGES = {}
+PAGE_DIGESTS = {}
+
+def page(name, source):
+    PAGES[f"{name}.html"] = BASE_STYLE + source
+    PAGE_DIGESTS[name] = hashlib.sha256(PAGES[f"{name}.html"].encode()).hexdigest()
+
+def render_page(name, **context):
+    with backends().metrics.timer("pokemon_render_duration_seconds", page=name):
+        return render_template(f"{name}.html", **context)
+
+def render_conditional(name, etag_data, **context):
+    """Page avec ETag faible calculé sur etag_data (+ version du template et de la feuille de style,
+    dont l'URL est dans la page) : 304 si rien n'a changé."""
+    payload = json.dumps([PAGE_DIGESTS[name], STYLE_HASH, etag_data], sort_keys=True, ensure_ascii=False)
+    etag = hashlib.sha1(payload.encode()).hexdigest()
+    if request.if_none_match.contains_weak(etag):
+        resp = Response(status=304)
+    else:
+        resp = Response(render_page(name, **context), mimetype="text/html")
+    resp.set_etag(etag, weak=True)
+    resp.cache_control.private = True
+    resp.cache_control.no_cache = True
+    return resp
+
+# Pages identiques pour toute une langue (aucun état de jeu) : rendues et compressées
+# une fois, puis servies telles quelles. nom -> dépend de la langue. La version (template, feuille
+# de style, traductions) est vérifiée à chaque service : une modification invalide l'entrée.
+STATIC_PAGES = {"home": False, "login": True, "signup": True, "quit": False}
+
+def cached_page(name, lang=None):
+    lang = lang if STATIC_PAGES[name] else None
+    version = (PAGE_DIGESTS[name], STYLE_HASH, LANG_DIGESTS.get(lang))
+    key = (name, lang, request.script_root)
+    pages = backends().pages
+    entry = pages.get(key)
+    if entry is None or entry[0] != version:
+        html = render_page(name, T=LANGUES[lang] if lang else None, msg="").encode()
+        entry = pages[key] = (version, precompress(html, current_app.config["COMPRESS_MIN_SIZE"]))
+    return serve_precompressed(request, Response(mimetype="text/html"), entry[1])
 
 # ================== ROUTES ==================
-@app.route("/", methods=["GET", "POST"])
-def home():
-    if request.method == "POST":
-        session["lang"] = request.form["lang"]
-        return redirect(url_for("login_page"))
-    
-    return render_template_string(BASE_STYLE + """
+# Enregistrées sur chaque app par create_app()
+ROUTES = []
+
+def route(rule, **options):
+    def decorator(view):
+        ROUTES.append((rule, view, options))
+        return view
+    return decorator
+
+def compress(response):
+    return compress_response(request, response, current_app.config["COMPRESS_MIN_SIZE"])
+
+# Latence par route, mesurée jusqu'après la sauvegarde de session (teardown)
+REQUEST_METRIC = "pokemon_http_request_duration_seconds"
+
+def start_timer():
+    g.request_start = time.perf_counter()
+
+def record_status(response):
+    g.response_status = response.status_code
+    return response
+
+def observe_request(exc):
+    if "request_start" in g:
+        backends().metrics.observe(REQUEST_METRIC, time.perf_counter() - g.request_start,
+                                   endpoint=request.endpoint or "none", method=request.method,
+                                   status=g.get("response_status", 500))
+
+@route("/metrics")
+def metrics():
+    return Response(backends().metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+@route("/assets/style.<digest>.css")
+def stylesheet(digest):
+    if digest != STYLE_HASH:
+        return redirect(url_for("stylesheet", digest=STYLE_HASH))
+    resp = Response(STYLE_CSS, mimetype="text/css")
+    resp.set_etag(STYLE_HASH)
+    resp.cache_control.public = True
+    resp.cache_control.max_age = 31536000
+    resp.cache_control.immutable = True
+    return resp.make_conditional(request)
+
+page("home", """
     <body><div class="container" style="text-align:center;">
         <h1>🎮 Pokémon Game</h1>
         <p style="font-size:1.2em;margin:20px 0;">Choisir la langue / Choose language / Выбрать язык</p>
@@ -176,22 +592,15 @@ def home():
     </div></body>
     """)
 
-@app.route("/login", methods=["GET", "POST"])
-def login_page():
-    lang = session.get("lang", "fr")
-    T = LANGUES[lang]
-    msg = ""
-    
+@route("/", methods=["GET", "POST"])
+def home():
     if request.method == "POST":
-        user, pw = request.form["username"], request.form["password"]
-        users = load_users()
-        if user in users and users[user]["password"] == hash_pw(pw):
-            session['username'] = user
-            session['game_state'] = load_game(user)
-            return redirect(url_for("menu"))
-        msg = "❌ Invalid credentials"
+        session["lang"] = request.form["lang"]
+        return redirect(url_for("login_page"))
     
-    return render_template_string(BASE_STYLE + """
+    return cached_page("home")
+
+page("login", """
     <body><div class="container">
         <h1>🎮 {{T['login']}}</h1>
         {% if msg %}<p class="msg msg-error">{{msg}}</p>{% endif %}
@@ -202,25 +611,21 @@ def login_page():
         </form>
         <a href="{{url_for('signup_page')}}"><button class="btn btn-secondary">{{T['register']}}</button></a>
     </div></body>
-    """, T=T, msg=msg)
+    """)
 
-@app.route("/signup", methods=["GET", "POST"])
-def signup_page():
+@route("/login", methods=["GET", "POST"])
+def login_page():
     lang = session.get("lang", "fr")
     T = LANGUES[lang]
-    msg = ""
     
     if request.method == "POST":
-        user, pw = request.form["username"], request.form["password"]
-        users = load_users()
-        if user in users:
-            msg = "❌ User exists"
-        else:
-            users[user] = {"password": hash_pw(pw)}
-            save_users(users)
-            return redirect(url_for("login_page"))
+        if authenticate(request.form["username"], request.form["password"]):
+            return redirect(url_for("menu"))
+        return render_page("login", T=T, msg="❌ Invalid credentials")
     
-    return render_template_string(BASE_STYLE + """
+    return cached_page("login", lang)
+
+page("signup", """
     <body><div class="container">
         <h1>📝 {{T['register']}}</h1>
         {% if msg %}<p class="msg msg-error">{{msg}}</p>{% endif %}
@@ -230,19 +635,21 @@ def signup_page():
             <button class="btn btn-secondary" type="submit">{{T['register']}}</button>
         </form>
     </div></body>
-    """, T=T, msg=msg)
+    """)
 
-@app.route("/menu")
-def menu():
-    if 'username' not in session:
-        return redirect(url_for("login_page"))
-    
+@route("/signup", methods=["GET", "POST"])
+def signup_page():
     lang = session.get("lang", "fr")
     T = LANGUES[lang]
-    state = get_state()
-    current_boss = bosses[state['boss_actuel']]['nom'] if state['boss_actuel'] < len(bosses) else "✅ Tous battus"
     
-    return render_template_string(BASE_STYLE + """
+    if request.method == "POST":
+        if not register(request.form["username"], request.form["password"]):
+            return render_page("signup", T=T, msg="❌ User exists")
+        return redirect(url_for("login_page"))
+    
+    return cached_page("signup", lang)
+
+page("menu", """
     <body><div class="container">
         <h1>🎮 {{T['menu']}}</h1>
         <div class="stat">
@@ -257,79 +664,77 @@ def menu():
             <a href="{{url_for('collection_page')}}"><button class="btn">{{T['collection']}}</button></a>
             <a href="{{url_for('sell')}}"><button class="btn">{{T['sell']}}</button></a>
             <a href="{{url_for('heal_team')}}"><button class="btn">{{T['heal_team']}}</button></a>
+            <a href="{{url_for('leaderboard_page')}}"><button class="btn">{{T['leaderboard']}}</button></a>
             <a href="{{url_for('save')}}"><button class="btn">{{T['save']}}</button></a>
             <a href="{{url_for('quit')}}"><button class="btn btn-secondary">{{T['quit']}}</button></a>
         </div>
     </div></body>
-    """, T=T, state=state, current_boss=current_boss, bosses=bosses)
+    """)
 
-@app.route("/booster", methods=["GET", "POST"])
-def booster():
+@route("/menu")
+def menu():
     if 'username' not in session:
         return redirect(url_for("login_page"))
     
     lang = session.get("lang", "fr")
     T = LANGUES[lang]
     state = get_state()
-    msg = ""
-    new_pkm = None
-    
-    if request.method == "POST":
-        if state['argent'] < 50:
-            msg = ("❌ Pas assez d'argent" if lang == "fr" else "❌ Not enough money" if lang == "en" else "❌ Недостаточно")
-        elif len(state['collection']) >= MAX_EQUIPE:
-            msg = ("⚠️ Équipe pleine" if lang == "fr" else "⚠️ Team full" if lang == "en" else "⚠️ Команда полна")
-        else:
-            state['argent'] -= 50
-            t = random.randint(1, 100)
-            if t <= 50:
-                nom = random.choice(["Pikachu", "Évoli"])
-            elif t <= 70:
-                nom = random.choice(["Lucario", "Dracolosse"])
-            elif t <= 90:
-                nom = random.choice(["Metalosse", "Tyranocif"])
-            elif t <= 98:
-                nom = "Dracaufeu"
-            else:
-                nom = "Mew"
-            
-            stats = pokemon_stats[nom]
-            new_pkm = {"nom": nom, "pv": stats["pv"], "pv_max": stats["pv"], 
-                      "attaque": stats["attaque"] + BONUS_ATK[stats["rarete"]], 
-                      "rarete": stats["rarete"], "niveau": 1, "xp": 0}
-            state['collection'].append(new_pkm)
-            update_state(state)
-            msg = f"✨ {T.get('got_pokemon', 'Obtenu')}: {nom} ({stats['rarete']}) !"
+    current_boss = GAME.bosses[state['boss_actuel']].nom if state['boss_actuel'] < len(GAME.bosses) else "✅ Tous battus"
     
-    return render_template_string(BASE_STYLE + """
+    return render_conditional("menu", [lang, state], T=T, state=state, current_boss=current_boss, bosses=GAME.bosses)
+
+page("booster", """
     <body><div class="container">
         <h1>🎁 {{T['booster']}}</h1>
         <div class="stat">💰 {{state['argent']}}€</div>
-        {% if msg %}<p class="msg {{'msg-success' if new_pkm else 'msg-error'}}">{{msg}}</p>{% endif %}
-        {% if new_pkm %}
+        {% if msg %}<p class="msg {{'msg-success' if new_pkms else 'msg-error'}}">{{msg}}</p>{% endif %}
+        {% for new_pkm in new_pkms %}
         <div class="pokemon-card" style="text-align:center;">
             <h2>{{new_pkm['nom']}}</h2>
             <p style="color:#667eea;font-weight:bold;">{{new_pkm['rarete']}} | Niv.{{new_pkm['niveau']}}</p>
             <p>❤️ {{new_pkm['pv']}} HP | ⚔️ {{new_pkm['attaque']}} ATK</p>
         </div>
-        {% endif %}
+        {% endfor %}
         <form method="post" style="text-align:center;margin:20px 0;">
             <button class="btn" type="submit">Ouvrir booster (50€)</button>
+            {% if room > 1 %}
+            <button class="btn btn-secondary" name="count" value="{{room}}" type="submit">Ouvrir x{{room}} ({{room * prix}}€)</button>
+            {% endif %}
         </form>
         <a href="{{url_for('menu')}}"><button class="btn btn-secondary">{{T['back']}}</button></a>
     </div></body>
-    """, T=T, state=state, msg=msg, new_pkm=new_pkm)
+    """)
 
-@app.route("/collection")
-def collection_page():
+@route("/booster", methods=["GET", "POST"])
+def booster():
     if 'username' not in session:
         return redirect(url_for("login_page"))
     
     lang = session.get("lang", "fr")
     T = LANGUES[lang]
     state = get_state()
+    msg = ""
+    new_pkms = []
     
-    return render_template_string(BASE_STYLE + """
+    if request.method == "POST":
+        try:
+            with player_rng() as rng:
+                new_pkms = open_boosters(state, rng, int_arg(request.form, "count", 1))
+            msg = f"✨ {T.get('got_pokemon', 'Obtenu')}: " + ", ".join(f"{p['nom']} ({p['rarete']})" for p in new_pkms) + " !"
+        except GameError as e:
+            if e.args[0] == "no_money":
+                msg = ("❌ Pas assez d'argent" if lang == "fr" else "❌ Not enough money" if lang == "en" else "❌ Недостаточно")
+            elif e.args[0] == "team_full":
+                msg = ("⚠️ Équipe pleine" if lang == "fr" else "⚠️ Team full" if lang == "en" else "⚠️ Команда полна")
+            else:  # bad_count / bad_param
+                msg = ("❌ Nombre de boosters invalide" if lang == "fr" else "❌ Invalid booster count" if lang == "en"
+                       else "❌ Неверное количество")
+    
+    room = MAX_EQUIPE - len(state['collection'])
+    return render_page("booster", T=T, state=state, msg=msg, new_pkms=new_pkms, prix=PRIX_BOOSTER,
+                       room=min(room, state['argent'] // PRIX_BOOSTER))
+
+page("collection", """
     <body><div class="container">
         <h1>📋 {{T['collection']}}</h1>
         {% if state['collection'] %}
@@ -348,31 +753,24 @@ def collection_page():
         {% endif %}
         <a href="{{url_for('menu')}}"><button class="btn btn-secondary">{{T['back']}}</button></a>
     </div></body>
-    """, T=T, state=state)
+    """)
 
-@app.route("/sell", methods=["GET", "POST"])
-def sell():
+@route("/collection")
+def collection_page():
     if 'username' not in session:
         return redirect(url_for("login_page"))
     
     lang = session.get("lang", "fr")
     T = LANGUES[lang]
     state = get_state()
-    msg = ""
     
-    if request.method == "POST" and state['collection']:
-        idx = int(request.form["index"])
-        pkm = state['collection'].pop(idx)
-        prix = PRIX_VENTE[pkm['rarete']]
-        state['argent'] += prix
-        update_state(state)
-        msg = f"💸 {pkm['nom']} vendu pour {prix}€"
-    
-    return render_template_string(BASE_STYLE + """
+    return render_conditional("collection", [lang, state], T=T, state=state)
+
+page("sell", """
     <body><div class="container">
         <h1>💸 {{T['sell']}}</h1>
         <div class="stat">💰 {{state['argent']}}€</div>
-        {% if msg %}<p class="msg msg-success">{{msg}}</p>{% endif %}
+        {% if msg %}<p class="msg {{'msg-success' if '💸' in msg else 'msg-error'}}">{{msg}}</p>{% endif %}
         {% if state['collection'] %}
             <form method="post">
                 {% for i, p in enumerate(state['collection']) %}
@@ -380,7 +778,7 @@ def sell():
                     <div>
                         <strong>{{p['nom']}}</strong> Niv.{{p['niveau']}} ({{p['rarete']}})
                     </div>
-                    <button class="btn" name="index" value="{{i}}" type="submit">Vendre {{PRIX_VENTE[p['rarete']]}}€</button>
+                    <button class="btn" name="index" value="{{i}}" type="submit">Vendre {{species[p['nom']].prix_vente}}€</button>
                 </div>
                 {% endfor %}
             </form>
@@ -389,10 +787,10 @@ def sell():
         {% endif %}
         <a href="{{url_for('menu')}}"><button class="btn btn-secondary">{{T['back']}}</button></a>
     </div></body>
-    """, T=T, state=state, msg=msg, enumerate=enumerate, PRIX_VENTE=PRIX_VENTE)
+    """)
 
-@app.route("/heal_team", methods=["GET", "POST"])
-def heal_team():
+@route("/sell", methods=["GET", "POST"])
+def sell():
     if 'username' not in session:
         return redirect(url_for("login_page"))
     
@@ -401,17 +799,18 @@ def heal_team():
     state = get_state()
     msg = ""
     
-    if request.method == "POST":
-        if state['argent'] < 30:
-            msg = "❌ Pas assez d'argent"
-        else:
-            state['argent'] -= 30
-            for p in state['collection']:
-                p['pv'] = p['pv_max']
-            update_state(state)
-            msg = "✨ Équipe soignée !"
+    if request.method == "POST" and state['collection']:
+        try:
+            pkm, prix = sell_pokemon(state, int_arg(request.form, "index", -1))
+            msg = f"💸 {pkm['nom']} vendu pour {prix}€"
+        except GameError as e:
+            if e.args[0] == "fight_in_progress":
+                msg = ("⚔️ Combat en cours : vente impossible" if lang == "fr" else
+                       "⚔️ Fight in progress: cannot sell" if lang == "en" else "⚔️ Идёт бой: продажа невозможна")
     
-    return render_template_string(BASE_STYLE + """
+    return render_page("sell", T=T, state=state, msg=msg, enumerate=enumerate, species=GAME.by_name)
+
+page("heal_team", """
     <body><div class="container">
         <h1>❤️ {{T['heal_team']}}</h1>
         <div class="stat">💰 {{state['argent']}}€</div>
@@ -421,53 +820,47 @@ def heal_team():
         </form>
         <a href="{{url_for('menu')}}"><button class="btn btn-secondary">{{T['back']}}</button></a>
     </div></body>
-    """, T=T, state=state, msg=msg)
+    """)
 
-@app.route("/fight", methods=["GET", "POST"])
-def fight():
+@route("/heal_team", methods=["GET", "POST"])
+def heal_team():
     if 'username' not in session:
         return redirect(url_for("login_page"))
     
     lang = session.get("lang", "fr")
     T = LANGUES[lang]
     state = get_state()
+    msg = ""
     
-    if state['boss_actuel'] >= len(bosses):
-        return render_template_string(BASE_STYLE + """
-        <body><div class="container">
-            <h1>🎊 FÉLICITATIONS !</h1>
-            <p style="text-align:center;font-size:1.5em;margin:40px 0;">Tous les boss sont vaincus !</p>
-            <a href="{{url_for('menu')}}"><button class="btn">{{T['back']}}</button></a>
-        </div></body>
-        """, T=T)
-    
-    boss = bosses[state['boss_actuel']]
-    available = [p for p in state['collection'] if p['pv'] > 0]
-    
-    if not available:
-        return render_template_string(BASE_STYLE + """
-        <body><div class="container">
-            <h1>❌ Aucun Pokémon disponible</h1>
-            <p style="text-align:center;margin:20px 0;">Soigne ton équipe avant de combattre !</p>
-            <a href="{{url_for('menu')}}"><button class="btn">{{T['back']}}</button></a>
-        </div></body>
-        """, T=T)
-    
-    if request.method == "POST" and 'pokemon_idx' not in session:
-        session['pokemon_idx'] = int(request.form['pokemon_idx'])
-        session['boss_pokemon'] = random.choice(boss['pokemon'])
-        stats = pokemon_stats[session['boss_pokemon']]
-        session['boss_pv'] = stats['pv'] + (boss['niveau'] * 10)
-        session['boss_pv_max'] = session['boss_pv']
-        session['boss_atk'] = stats['attaque'] + (boss['niveau'] * 2)
-        session['combat_log'] = []
-        session.modified = True
-        return redirect(url_for('fight_action'))
+    if request.method == "POST":
+        try:
+            heal_all(state)
+            msg = "✨ Équipe soignée !"
+        except GameError:
+            msg = "❌ Pas assez d'argent"
     
-    return render_template_string(BASE_STYLE + """
+    return render_page("heal_team", T=T, state=state, msg=msg)
+
+page("fight_done", """
     <body><div class="container">
-        <h1>⚔️ Combattre {{boss['nom']}}</h1>
-        <p style="text-align:center;margin:20px 0;font-size:1.2em;">Niveau {{boss['niveau']}} | Récompense: {{boss['recompense']}}€</p>
+        <h1>🎊 FÉLICITATIONS !</h1>
+        <p style="text-align:center;font-size:1.5em;margin:40px 0;">Tous les boss sont vaincus !</p>
+        <a href="{{url_for('menu')}}"><button class="btn">{{T['back']}}</button></a>
+    </div></body>
+    """)
+
+page("fight_empty", """
+    <body><div class="container">
+        <h1>❌ Aucun Pokémon disponible</h1>
+        <p style="text-align:center;margin:20px 0;">Soigne ton équipe avant de combattre !</p>
+        <a href="{{url_for('menu')}}"><button class="btn">{{T['back']}}</button></a>
+    </div></body>
+    """)
+
+page("fight", """
+    <body><div class="container">
+        <h1>⚔️ Combattre {{boss.nom}}</h1>
+        <p style="text-align:center;margin:20px 0;font-size:1.2em;">Niveau {{boss.niveau}} | Récompense: {{boss.recompense}}€</p>
         <h2>{{T['choose_pokemon']}}</h2>
         <form method="post">
             {% for i, p in enumerate(available) %}
@@ -480,68 +873,45 @@ def fight():
         </form>
         <a href="{{url_for('menu')}}"><button class="btn btn-secondary">{{T['back']}}</button></a>
     </div></body>
-    """, T=T, boss=boss, available=available, enumerate=enumerate)
+    """)
 
-@app.route("/fight_action", methods=["GET", "POST"])
-def fight_action():
-    if 'username' not in session or 'pokemon_idx' not in session:
-        return redirect(url_for("fight"))
+@route("/fight", methods=["GET", "POST"])
+def fight():
+    if 'username' not in session:
+        return redirect(url_for("login_page"))
     
     lang = session.get("lang", "fr")
     T = LANGUES[lang]
     state = get_state()
-    boss = bosses[state['boss_actuel']]
+    
+    if state['boss_actuel'] >= len(GAME.bosses):
+        return render_page("fight_done", T=T)
+    
+    boss = GAME.bosses[state['boss_actuel']]
     available = [p for p in state['collection'] if p['pv'] > 0]
-    pokemon = available[session['pokemon_idx']]
     
-    msg = ""
-    if request.method == "POST":
-        action = request.form['action']
-        log = session.get('combat_log', [])
-        
-        if action == "attack":
-            dmg = random.randint(pokemon['attaque']-5, pokemon['attaque']+5)
-            if random.randint(1,100) <= 15:
-                dmg = int(dmg * 1.5)
-                log.append(f"💥 {pokemon['nom']} CRITIQUE: -{dmg}")
-            else:
-                log.append(f"⚔️ {pokemon['nom']}: -{dmg}")
-            session['boss_pv'] -= dmg
-        elif action == "heal":
-            heal = int(pokemon['pv_max'] * 0.45)
-            pokemon['pv'] = min(pokemon['pv_max'], pokemon['pv'] + heal)
-            log.append(f"💚 {pokemon['nom']}: +{heal} HP")
-        
-        if session['boss_pv'] > 0:
-            if random.randint(1,100) <= 20:
-                heal = int(session['boss_pv_max'] * 0.45)
-                session['boss_pv'] = min(session['boss_pv_max'], session['boss_pv'] + heal)
-                log.append(f"💚 Boss: +{heal} HP")
-            else:
-                dmg = random.randint(session['boss_atk']-5, session['boss_atk']+5)
-                if random.randint(1,100) <= 15:
-                    dmg = int(dmg * 1.5)
-                    log.append(f"⚡ Boss CRITIQUE: -{dmg}")
-                else:
-                    log.append(f"🔥 Boss: -{dmg}")
-                pokemon['pv'] -= dmg
-        
-        session['combat_log'] = log[-5:]
-        session.modified = True
-        update_state(state)
-        
-        if pokemon['pv'] <= 0 or session['boss_pv'] <= 0:
-            return redirect(url_for('fight_result'))
+    if not available:
+        return render_page("fight_empty", T=T)
+    
+    if request.method == "POST" and 'combat' not in session:
+        try:
+            with player_rng() as rng:
+                start_fight(state, int_arg(request.form, 'pokemon_idx', -1), rng)
+            return redirect(url_for('fight_action'))
+        except GameError:
+            pass  # choix invalide : on réaffiche la liste
     
-    return render_template_string(BASE_STYLE + """
+    return render_page("fight", T=T, boss=boss, available=available, enumerate=enumerate)
+
+page("fight_action", """
     <body><div class="container">
-        <h1>⚔️ Combat vs {{boss['nom']}}</h1>
+        <h1>⚔️ Combat vs {{boss.nom}}</h1>
         <div class="pokemon-card">
-            <h3>🔥 Boss: {{session['boss_pokemon']}} Niv.{{boss['niveau']}}</h3>
+            <h3>🔥 Boss: {{combat.boss_pokemon}} Niv.{{boss.niveau}}</h3>
             <div class="health-bar">
-                <div class="health-fill" style="width:{{(session['boss_pv']/session['boss_pv_max']*100)}}%;"></div>
+                <div class="health-fill" style="width:{{(combat.boss_pv/combat.boss_pv_max*100)}}%;"></div>
             </div>
-            <p>❤️ {{session['boss_pv']}}/{{session['boss_pv_max']}} HP</p>
+            <p>❤️ {{combat.boss_pv}}/{{combat.boss_pv_max}} HP</p>
         </div>
         <div class="pokemon-card">
             <h3>💙 {{pokemon['nom']}} Niv.{{pokemon['niveau']}}</h3>
@@ -559,81 +929,127 @@ def fight_action():
                 <input type="hidden" name="action" value="heal">
                 <button class="btn" type="submit">{{T['heal']}}</button>
             </form>
+            <form method="post" style="display:inline-block;margin:10px;">
+                <input type="hidden" name="action" value="auto">
+                <input type="hidden" name="heal_below" value="{{auto_heal_below}}">
+                <button class="btn btn-secondary" type="submit">{{T['auto']}}</button>
+            </form>
         </div>
         <div style="background:#eee;padding:10px;border-radius:10px;margin-top:20px;">
-            {% for line in session.get('combat_log', []) %}
+            {% for line in combat.log %}
             <p>{{line}}</p>
             {% endfor %}
         </div>
         <a href="{{url_for('menu')}}"><button class="btn btn-secondary">{{T['back']}}</button></a>
     </div></body>
-    """, T=T, boss=boss, pokemon=pokemon, session=session)
+    """)
 
-@app.route("/fight_result")
-def fight_result():
-    if 'username' not in session or 'pokemon_idx' not in session:
-        return redirect(url_for("menu"))
+@route("/fight_action", methods=["GET", "POST"])
+def fight_action():
+    if 'username' not in session or 'combat' not in session:
+        return redirect(url_for("fight"))
     
     lang = session.get("lang", "fr")
     T = LANGUES[lang]
     state = get_state()
-    boss = bosses[state['boss_actuel']]
-    available = [p for p in state['collection'] if p['pv'] > 0]
-    pokemon = available[session['pokemon_idx']]
+    boss = GAME.bosses[state['boss_actuel']]
+    combat = engine.CombatState.from_dict(session['combat'])
+    pokemon = state['collection'][combat.pokemon_idx]
+    if combat.finished:
+        return redirect(url_for('fight_result'))
     
-    msg = ""
-    is_victory = False
-    
-    if pokemon['pv'] <= 0:
-        # Défaite
-        state['argent'] += 25
-        pokemon['pv'] = max(1, int(pokemon['pv_max'] * 0.25))  # récupère un peu
-        msg = T["defeat"]
-        is_victory = False
-    else:
-        # Victoire
-        xp_gain = boss["niveau"] * 50
-        pokemon["xp"] += xp_gain
-        
-        # Vérifier montée de niveau
-        xp_needed = pokemon["niveau"] * 100
-        if pokemon["xp"] >= xp_needed:
-            pokemon["niveau"] += 1
-            pokemon["xp"] = 0
-            pokemon["attaque"] += 3
-            pokemon["pv_max"] += 10
-            pokemon["pv"] = pokemon["pv_max"]
-        
-        state['argent'] += boss["recompense"]
-        state['boss_actuel'] += 1
-        msg = T["victory"]
-        is_victory = True
-    
-    update_state(state)
-    
-    # Nettoyer la session du combat
-    keys_to_clear = ['pokemon_idx', 'boss_pokemon', 'boss_pv', 'boss_pv_max', 'boss_atk', 'combat_log']
-    for k in keys_to_clear:
-        session.pop(k, None)
-    session.modified = True
+    if request.method == "POST":
+        action = request.form.get('action')
+        try:
+            heal_below = int_arg(request.form, 'heal_below', AUTO_HEAL_BELOW)
+        except GameError:
+            heal_below = AUTO_HEAL_BELOW
+        try:
+            play_turn(state, combat, action, heal_below)
+        except GameError:
+            # Action inconnue : on réaffiche le combat sans jouer de tour
+            return render_page("fight_action", T=T, boss=boss, pokemon=pokemon, combat=combat,
+                               auto_heal_below=AUTO_HEAL_BELOW)
+        if action == "auto":
+            # Tout le combat en une requête (abandon au-delà de AUTO_MAX_TURNS), puis directement le résultat
+            return conclude_fight(T, state, combat)
+        if combat.finished:
+            return redirect(url_for('fight_result'))
     
-    return render_template_string(BASE_STYLE + """
+    return render_page("fight_action", T=T, boss=boss, pokemon=pokemon, combat=combat,
+                       auto_heal_below=AUTO_HEAL_BELOW)
+
+page("fight_result", """
     <body><div class="container">
         <h1>{% if is_victory %}🏆 {{T['victory']}}{% else %}💀 {{T['defeat']}}{% endif %}</h1>
         <p style="text-align:center;font-size:1.4em;margin:30px 0;">{{msg}}</p>
-        {% if is_victory and state['boss_actuel'] >= len(bosses) %}
+        {% if is_victory and state['boss_actuel'] >= bosses|length %}
         <p style="text-align:center;color:#667eea;font-weight:bold;font-size:1.3em;">🎊 Tous les boss sont vaincus !</p>
         {% endif %}
+        {% if log %}
+        <div style="background:#eee;padding:10px;border-radius:10px;margin:20px 0;">
+            {% for line in log %}
+            <p>{{line}}</p>
+            {% endfor %}
+        </div>
+        {% endif %}
         <a href="{{url_for('menu')}}"><button class="btn">{{T['back']}}</button></a>
     </div></body>
-    """, T=T, msg=msg, is_victory=is_victory, state=state, bosses=bosses)
+    """)
 
-@app.route("/save")
-def save():
-    if 'username' not in session:
-        return redirect(url_for("login_page"))
-    save_game(session['username'], get_state())
-    return render_template_string(BASE_STYLE + """
+def conclude_fight(T, state, combat):
+    is_victory, gain = settle_fight(state, combat)
+    msg = T["victory"] if is_victory else T["defeat"]
+    return render_page("fight_result", T=T, msg=msg, is_victory=is_victory, state=state, bosses=GAME.bosses,
+                       log=combat.log)
+
+@route("/fight_result")
+def fight_result():
+    if 'username' not in session or 'combat' not in session:
+        return redirect(url_for("menu"))
+    
+    lang = session.get("lang", "fr")
+    T = LANGUES[lang]
+    combat = engine.CombatState.from_dict(session['combat'])
+    if not combat.finished:
+        return redirect(url_for('fight_action'))
+    return conclude_fight(T, get_state(), combat)
+
+LEADERBOARD_TOP = 20
+
+page("leaderboard", """
+    <body><div class="container">
+        <h1>{{T['leaderboard']}}</h1>
+        <div style="text-align:center;">
+            {% for b, label in boards %}
+            <a href="{{url_for('leaderboard_page', board=b)}}"><button class="btn {{'' if b == board else 'btn-secondary'}}">{{label}}</button></a>
+            {% endfor %}
+        </div>
+        {% if me %}<div class="stat">#{{me['rang']}} {{me['joueur']}} : {{me['score']}}</div>{% endif %}
+        {% for e in top %}
+        <div class="pokemon-card" style="display:flex;justify-content:space-between;">
+            <strong>#{{e['rang']}} {{e['joueur']}}</strong><span>{{e['score']}}</span>
+        </div>
+        {% else %}
+        <p style="text-align:center;color:#999;margin:40px 0;">—</p>
+        {% endfor %}
+        <a href="{{url_for('menu')}}"><button class="btn btn-secondary">{{T['back']}}</button></a>
+    </div></body>
+    """)
+
+@route("/leaderboard")
+def leaderboard_page():
+    lang = session.get("lang", "fr")
+    T = LANGUES[lang]
+    board = request.args.get("board", "boss")
+    if board not in BOARDS:
+        board = "boss"
+    lb = backends().leaderboard
+    me = lb.rank(session['username'], board) if 'username' in session else None
+    boards = zip(BOARDS, (T['boss_progress'], T['money'], T['power']))
+    return render_page("leaderboard", T=T, board=board, boards=boards, top=lb.top(board, LEADERBOARD_TOP), me=me)
+
+page("save", """
     <body><div class="container">
         <h1>💾 Sauvegarde</h1>
         <p class="msg msg-success">Partie sauvegardée !</p>
@@ -641,10 +1057,14 @@ def save():
     </div></body>
     """)
 
-@app.route("/quit")
-def quit():
-    session.clear()
-    return render_template_string(BASE_STYLE + """
+@route("/save")
+def save():
+    if 'username' not in session:
+        return redirect(url_for("login_page"))
+    request_save()
+    return render_page("save")
+
+page("quit", """
     <body><div class="container">
         <h1>👋 Au revoir !</h1>
         <p style="text-align:center;margin:30px 0;">Merci d'avoir joué !</p>
@@ -652,6 +1072,146 @@ def quit():
     </div></body>
     """)
 
+@route("/quit")
+def quit():
+    session.clear()
+    return cached_page("quit")
+
+# ================== API JSON ==================
+# Mêmes actions que les pages, pour les bots / clients mobiles : réponses
+# compactes ne contenant que ce qui a changé dans l'état.
+api = Blueprint("api", __name__, url_prefix="/api/v1")
+
+def api_data():
+    return request.get_json(silent=True) or request.form
+
+@api.before_request
+def api_auth():
+    if request.endpoint not in ("api.api_login", "api.api_signup", "api.api_leaderboard") and 'username' not in session:
+        return jsonify(error="unauthorized"), 401
+
+@api.errorhandler(GameError)
+def api_game_error(e):
+    # Paramètre illisible : requête invalide ; sinon action refusée dans l'état actuel
+    return jsonify(error=e.args[0]), 400 if e.args[0] == "bad_param" else 409
+
+@api.post("/signup")
+def api_signup():
+    d = api_data()
+    username, password = d.get("username"), d.get("password")
+    if not all(isinstance(v, str) and v for v in (username, password)):
+        raise GameError("bad_param")
+    if not register(username, password):
+        return jsonify(error="user_exists"), 409
+    return jsonify(ok=True), 201
+
+@api.post("/login")
+def api_login():
+    d = api_data()
+    if not authenticate(d.get("username", ""), d.get("password", "")):
+        return jsonify(error="invalid_credentials"), 401
+    return jsonify(state=get_state(), combat=public_fight())
+
+@api.get("/state")
+def api_state():
+    return jsonify(state=get_state(), combat=public_fight())
+
+@api.post("/booster")
+def api_booster():
+    state = get_state()
+    with player_rng() as rng:
+        opened = open_boosters(state, rng, int_arg(api_data(), "count", 1))
+    # "added" (dernier Pokémon obtenu) reste pour les clients v1 qui n'ouvrent qu'un booster
+    return jsonify(argent=state['argent'], added=opened[-1], opened=opened)
+
+@api.post("/sell")
+def api_sell():
+    state = get_state()
+    idx = int_arg(api_data(), "index", -1)
+    pkm, prix = sell_pokemon(state, idx)
+    return jsonify(argent=state['argent'], removed=idx, prix=prix)
+
+@api.post("/heal_team")
+def api_heal_team():
+    state = get_state()
+    heal_all(state)
+    return jsonify(argent=state['argent'], pv=[p['pv'] for p in state['collection']])
+
+@api.post("/fight")
+def api_fight():
+    if 'combat' in session:
+        raise GameError("fight_in_progress")
+    with player_rng() as rng:
+        combat = start_fight(get_state(), int_arg(api_data(), "pokemon_idx", 0), rng)
+    return jsonify(combat=combat.public_dict())
+
+@api.post("/fight_action")
+def api_fight_action():
+    d = api_data()
+    state, combat = get_state(), current_fight()
+    # Combat fini mais pas encore réglé (tour final joué depuis les pages) : on le règle sans rejouer
+    log = [] if combat.finished else play_turn(state, combat, d.get("action", "attack"),
+                                                int_arg(d, "heal_below", AUTO_HEAL_BELOW))
+    diff = {"boss_pv": combat.boss_pv, "pv": combat.pv, "log": log, "finished": combat.finished}
+    if combat.finished:
+        is_victory, gain = settle_fight(state, combat)
+        diff.update(victory=is_victory, gain=gain, argent=state['argent'], boss_actuel=state['boss_actuel'],
+                    pokemon=state['collection'][combat.pokemon_idx])
+    return jsonify(diff)
+
+@api.get("/leaderboard")
+def api_leaderboard():
+    board = request.args.get("board", "boss")
+    if board not in BOARDS:
+        return jsonify(error="bad_board"), 400
+    limit = max(min(int_arg(request.args, "limit", 10), 100), 0)
+    offset = max(int_arg(request.args, "offset", 0), 0)
+    lb = backends().leaderboard
+    me = lb.rank(session['username'], board) if 'username' in session else None
+    return jsonify(board=board, top=lb.top(board, limit, offset), me=me)
+
+@api.post("/save")
+def api_save():
+    request_save()
+    return jsonify(ok=True)
+
+# ================== APP ==================
+def create_app(config=None):
+    app = Flask(__name__)
+    app.config.update(DEFAULT_CONFIG)
+    app.config.update(config or {})
+    if app.config["WORKERS"] > 1 and app.config["SESSION_BACKEND"] == "memory":
+        raise RuntimeError("Le backend de session 'memory' n'est pas partagé entre workers : utiliser 'sqlite'")
+    app.extensions["pokemon"] = backends = Backends(app.config)
+    app.session_interface = ServerSessionInterface(make_backend(app.config["SESSION_BACKEND"], app.config["SESSIONS_DB"]),
+                                                   timer=backends.phase)
+    backends.metrics.describe(REQUEST_METRIC, "Durée des requêtes HTTP par route, méthode et statut")
+
+    app.jinja_loader = DictLoader(PAGES)
+    app.jinja_env.globals["STYLE_HASH"] = STYLE_HASH
+    for rule, view, options in ROUTES:
+        app.add_url_rule(rule, view_func=view, **options)
+    app.before_request(start_timer)
+    app.after_request(compress)
+    app.after_request(record_status)  # enregistré en dernier : appelé en premier, statut final
+    app.teardown_request(observe_request)
+    app.register_blueprint(api)
+
+    if not len(backends.leaderboard):
+        # Démarrage à froid (aucun score publié) : classement recalculé en fond depuis les sauvegardes
+        threading.Thread(target=backends.rebuild_leaderboard, name="leaderboard-rebuild", daemon=True).start()
+
+    # Toutes les pages compilées dès le démarrage, et les pages sans état déjà rendues
+    for name in PAGES:
+        app.jinja_env.get_template(name)
+    if app.config["PRERENDER_PAGES"]:
+        with app.test_request_context():
+            for name, per_lang in STATIC_PAGES.items():
+                for lang in (LANGUES if per_lang else [None]):
+                    cached_page(name, lang)
+    return app
+
 # ================== RUN SERVER ==================
+# Serveur de développement uniquement ; en production : voir wsgi.py
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    create_app().run(debug=True)
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""Point d'entrée ASGI : l'app Flask servie par un serveur asynchrone.
+
+    POKEMON_WORKER_CLASS=asgi gunicorn -c gunicorn.conf.py asgi:app
+    uvicorn asgi:app --workers 4                # ou tout autre serveur ASGI
+
+La boucle asyncio porte les connexions : des milliers de clients inactifs ou
+lents (keep-alive, corps de requête envoyé au compte-gouttes, lecture lente de
+la réponse) ne coûtent qu'une coroutine chacun. Seule la vue Flask, avec ses
+E/S bloquantes (sauvegardes, comptes et sessions SQLite, PBKDF2), tourne dans
+un pool de threads borné ; la boucle n'attend jamais le disque.
+
+    POKEMON_ASGI_THREADS      threads du pool par processus (défaut : 16)
+    POKEMON_ASGI_MAX_PENDING  requêtes en cours ou en attente du pool au-delà
+                              desquelles on répond 503 (défaut : 1024)
+"""
+import asyncio, io, sys
+from concurrent.futures import ThreadPoolExecutor
+from Qwen_python_20260113_llvcbh3vy import create_app
+
+
+def _environ(scope, body):
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1] or 80),
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.input_terminated": True,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope["headers"]:
+        name, value = name.decode("latin-1"), value.decode("latin-1")
+        if name == "content-type":
+            key = "CONTENT_TYPE"
+        elif name == "content-length":
+            key = "CONTENT_LENGTH"
+        else:
+            key = "HTTP_" + name.upper().replace("-", "_")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    # Corps déjà lu en entier : sa taille fait foi (chunked, HTTP/2 sans content-length)
+    environ["CONTENT_LENGTH"] = str(len(body))
+    return environ
+
+
+class WSGIToASGI:
+    """Adaptateur WSGI -> ASGI : corps lu et réponse envoyée en asynchrone, la vue dans le pool."""
+
+    def __init__(self, wsgi_app, threads=16, max_pending=1024, on_shutdown=None):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(threads, thread_name_prefix="asgi-view")
+        self.max_pending = max_pending
+        self.pending = 0
+        self.on_shutdown = on_shutdown
+
+    def _run(self, environ):
+        # Dans un thread du pool : toute la requête Flask, teardown (métriques) compris
+        started = []
+
+        def start_response(status, headers, exc_info=None):
+            started[:] = [status, headers]
+
+        result = self.wsgi_app(environ, start_response)
+        try:
+            body = b"".join(result)
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        status, headers = started
+        return int(status.split(" ", 1)[0]), headers, body
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] != "http":
+            return
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        if self.pending >= self.max_pending:
+            await send({"type": "http.response.start", "status": 503, "headers": [(b"retry-after", b"1")]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        self.pending += 1
+        try:
+            status, headers, body = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self._run, _environ(scope, b"".join(chunks)))
+        finally:
+            self.pending -= 1
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self.on_shutdown is not None:
+                    # Sauvegardes en attente écrites avant l'arrêt du processus
+                    await asyncio.get_running_loop().run_in_executor(self.executor, self.on_shutdown)
+                self.executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+flask_app = create_app()
+_backends = flask_app.extensions["pokemon"]
+app = WSGIToASGI(flask_app, flask_app.config["ASGI_THREADS"], flask_app.config["ASGI_MAX_PENDING"],
+                 on_shutdown=_backends.saver.flush)
+_backends.metrics.gauge(lambda: [("pokemon_asgi_pending_requests", {}, app.pending)])
@@ -0,0 +1,75 @@
+"""Benchmark: serveur synchrone (gunicorn gthread, wsgi:app) contre mode ASGI (gunicorn asgi, asgi:app).
+
+Même nombre de workers pour les deux. Pour chaque serveur : un test de charge
+(bench/loadtest.py) seul, puis le même pendant que N connexions restent ouvertes
+sans rien envoyer (clients inactifs ou lents), qui occupent chacune un thread
+en gthread et une simple coroutine en ASGI.
+
+    python bench/bench_asgi.py [--workers 1] [--idle 1000] [--players 10] [--duration 10]
+"""
+import argparse, os, shutil, socket, subprocess, sys, tempfile, time, urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+import loadtest
+
+SERVERS = {"sync (gthread)": ("gthread", "wsgi:app"), "asgi": ("asgi", "asgi:app")}
+
+
+def start(worker_class, module, workers, port, directory):
+    env = dict(os.environ, POKEMON_WORKER_CLASS=worker_class, POKEMON_WORKERS=str(workers),
+               POKEMON_BIND=f"127.0.0.1:{port}", PYTHONPATH=ROOT)
+    proc = subprocess.Popen(["gunicorn", "-c", os.path.join(ROOT, "gunicorn.conf.py"), "--chdir", directory,
+                             "--access-logfile", "/dev/null", module],
+                            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1).read()
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"{module} n'a pas démarré")
+
+
+def idle_connections(port, n):
+    sockets = []
+    for _ in range(n):
+        s = socket.create_connection(("127.0.0.1", port))
+        s.sendall(b"GET / HTTP/1.1\r\nHost: bench\r\n")  # en-têtes jamais terminés : client lent
+        sockets.append(s)
+    return sockets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=1, help="processus par serveur (= cœurs utilisés)")
+    parser.add_argument("--idle", type=int, default=1000, help="connexions inactives pendant la 2e mesure")
+    parser.add_argument("--players", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    for label, (worker_class, module) in SERVERS.items():
+        directory = tempfile.mkdtemp(prefix="bench-asgi-")
+        proc = start(worker_class, module, args.workers, args.port, directory)
+        try:
+            url = f"http://127.0.0.1:{args.port}"
+            print(f"\n=== {label}, {args.workers} worker(s) ===")
+            loadtest.main(["--url", url, "--players", str(args.players), "--duration", str(args.duration)])
+            print(f"\n--- avec {args.idle} connexions inactives ---")
+            sockets = idle_connections(args.port, args.idle)
+            try:
+                loadtest.main(["--url", url, "--players", str(args.players), "--duration", str(args.duration)])
+            finally:
+                for s in sockets:
+                    s.close()
+        finally:
+            proc.terminate()
+            proc.wait()
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""Benchmark: débit du tirage des boosters (méthode des alias) et taux observés par palier.
+
+Le contrôle statistique des taux (χ²) est dans tests/test_drops.py.
+
+    python bench/bench_drops.py [tirages] [seed]
+"""
+import os, sys, time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from drops import DropTable
+from game_data import load
+
+def main(n=1_000_000, seed=12345):
+    game = load()
+    table = DropTable(game.booster.probabilities, seed=seed)
+    start = time.perf_counter()
+    draws = table.draw_many(n)
+    elapsed = time.perf_counter() - start
+    tier_of = {s.nom: i for i, (group, _) in enumerate(game.booster_tiers) for s in group}
+    per_tier = Counter(tier_of[s.nom] for s in draws)
+    total_rate = sum(taux for _, taux in game.booster_tiers)
+
+    print(f"{n} tirages (seed {seed}) en {elapsed:.2f}s, {n / elapsed / 1e6:.2f} M tirages/s")
+    print(f"{'palier':<28}{'attendu':>10}{'observé':>10}")
+    for i, (group, taux) in enumerate(game.booster_tiers):
+        names = "/".join(s.nom for s in group)
+        print(f"{names:<28}{taux / total_rate:>10.3%}{per_tier[i] / n:>10.3%}")
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args[0:1] else 1_000_000, int(args[1]) if args[1:2] else 12345)
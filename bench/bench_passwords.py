@@ -0,0 +1,42 @@
+"""Benchmark: logins/s selon le coût du hachage des mots de passe.
+
+Vérifie des mots de passe depuis plusieurs threads "requête" en parallèle, comme
+le ferait un serveur multi-thread, pour chaque réglage de coût.
+
+    python bench/bench_passwords.py [secondes_par_cout] [threads]
+"""
+import hashlib, os, sys, threading, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from passwords import PasswordHasher
+
+COSTS = [None, 10_000, 50_000, 100_000, 200_000, 600_000]  # None = ancien SHA-256
+
+def logins_per_second(cost, seconds, threads):
+    hasher = PasswordHasher(cost or 1)
+    stored = hashlib.sha256(b"hunter2").hexdigest() if cost is None else hasher.hash("hunter2")
+    done = [0] * threads
+    deadline = time.perf_counter() + seconds
+
+    def worker(i):
+        while time.perf_counter() < deadline:
+            assert hasher.verify(stored, "hunter2")
+            done[i] += 1
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return sum(done) / (time.perf_counter() - start)
+
+def main(seconds=2.0, threads=16):
+    print(f"{os.cpu_count()} CPU, {threads} threads requête")
+    print(f"{'coût':>12}{'logins/s':>12}{'latence ms':>12}")
+    for cost in COSTS:
+        rate = logins_per_second(cost, seconds, threads)
+        print(f"{'sha256' if cost is None else cost:>12}{rate:>12.0f}{1000 / rate * threads:>12.1f}")
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 2.0, int(sys.argv[2]) if len(sys.argv) > 2 else 16)
@@ -0,0 +1,46 @@
+"""Benchmark: taille et vitesse des sauvegardes JSON (indent=2, compact) vs binaire.
+
+Pour des collections de tailles croissantes : octets sur disque, encodage,
+décodage complet, et lecture de l'en-tête seul (argent / boss_actuel).
+
+    python bench/bench_save_format.py [répétitions]
+"""
+import json, os, random, sys, timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Qwen_python_20260113_llvcbh3vy import GAME, save_codec
+
+SIZES = [0, 6, 50, 500]
+
+def make_state(n, rng):
+    collection = []
+    for _ in range(n):
+        s, niveau = rng.choice(GAME.species), rng.randint(1, 30)
+        pv_max = s.pv + (niveau - 1) * 10
+        collection.append({"nom": s.nom, "pv": rng.randint(0, pv_max), "pv_max": pv_max,
+                           "attaque": s.booster_atk + (niveau - 1) * 3,
+                           "rarete": s.rarete, "niveau": niveau, "xp": rng.randint(0, 99)})
+    return {"argent": rng.randint(0, 10**6), "collection": collection, "boss_actuel": rng.randint(0, 5)}
+
+def us(stmt, number):
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+def main(number=2000):
+    rng = random.Random(0)
+    print(f"{'collection':>10} {'format':<12}{'octets':>9}{'encode µs':>12}{'décode µs':>12}{'en-tête µs':>12}")
+    for n in SIZES:
+        state = make_state(n, rng)
+        formats = {
+            "json indent": (lambda s=state: json.dumps(s, ensure_ascii=False, indent=2).encode(), json.loads, json.loads),
+            "json compact": (lambda s=state: json.dumps(s, ensure_ascii=False, separators=(",", ":")).encode(), json.loads, json.loads),
+            "binaire": (lambda s=state: save_codec.encode(s), save_codec.loads, save_codec.decode),
+        }
+        for name, (encode, decode, header) in formats.items():
+            blob = encode()
+            assert decode(blob) == state
+            assert header(blob)["argent"] == state["argent"]
+            print(f"{n:>10} {name:<12}{len(blob):>9}{us(encode, number):>12.1f}"
+                  f"{us(lambda: decode(blob), number):>12.1f}{us(lambda: header(blob)['argent'], number):>12.1f}")
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
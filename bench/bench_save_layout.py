@@ -0,0 +1,57 @@
+"""Benchmark: dossier de sauvegardes plat contre éclats hachés (ab/cd/<hash>).
+
+Crée N petits fichiers dans chaque arborescence (dossier temporaire), puis mesure
+la latence d'un stat et d'une ouverture + lecture sur des joueurs tirés au hasard.
+
+    python bench/bench_save_layout.py [N,N,...] [lectures]     # défaut 10000,100000 ; 1000000 possible
+"""
+import os, random, shutil, sys, tempfile, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from save_layout import ShardedLayout
+
+PAYLOAD = b'{"argent": 100, "boss_actuel": 0, "collection": []}'
+
+
+def build(root, n):
+    flat = os.path.join(root, "flat")
+    os.makedirs(flat)
+    sharded = ShardedLayout(os.path.join(root, "sharded"))
+    start = time.perf_counter()
+    for i in range(n):
+        with open(os.path.join(flat, f"joueur{i}.json"), "wb") as f:
+            f.write(PAYLOAD)
+    flat_build = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in range(n):
+        with open(sharded.path(f"joueur{i}", ".json", create=True), "wb") as f:
+            f.write(PAYLOAD)
+    return (lambda user: os.path.join(flat, f"{user}.json"), flat_build), \
+           (lambda user: sharded.path(user, ".json"), time.perf_counter() - start)
+
+
+def measure(path_for, n, reads):
+    users = [f"joueur{random.randrange(n)}" for _ in range(reads)]
+    start = time.perf_counter()
+    for user in users:
+        os.stat(path_for(user))
+    stat_us = (time.perf_counter() - start) / reads * 1e6
+    start = time.perf_counter()
+    for user in users:
+        with open(path_for(user), "rb") as f:
+            f.read()
+    return stat_us, (time.perf_counter() - start) / reads * 1e6
+
+
+if __name__ == "__main__":
+    sizes = [int(n) for n in sys.argv[1].split(",")] if len(sys.argv) > 1 else [10_000, 100_000]
+    reads = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    print(f"{'fichiers':>10} {'disposition':<12}{'création s':>12}{'stat µs':>10}{'lecture µs':>12}")
+    for n in sizes:
+        root = tempfile.mkdtemp(prefix="bench-layout-")
+        try:
+            for label, (path_for, built) in zip(("plat", "éclats"), build(root, n)):
+                stat_us, read_us = measure(path_for, n, reads)
+                print(f"{n:>10} {label:<12}{built:>12.2f}{stat_us:>10.1f}{read_us:>12.1f}")
+        finally:
+            shutil.rmtree(root)
@@ -0,0 +1,41 @@
+"""Benchmark: render_template_string (avant) vs registre de pages compilées (après).
+
+    python bench/bench_templates.py [iterations]
+"""
+import os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flask import render_template_string
+import Qwen_python_20260113_llvcbh3vy as jeu
+from combat import CombatState
+
+STATE = {"argent": 420, "boss_actuel": 1, "collection": [
+    {"nom": "Pikachu", "pv": 80, "pv_max": 100, "attaque": 30, "rarete": "Commun", "niveau": 2, "xp": 40},
+    {"nom": "Mew", "pv": 170, "pv_max": 170, "attaque": 75, "rarete": "Mythique", "niveau": 1, "xp": 0},
+]}
+COMBAT = CombatState("Lucario", 120, 180, 45, 0, "Pikachu", 80, 100, 30, ["⚔️ Pikachu: -31", "🔥 Boss: -44"])
+
+CASES = {
+    "menu": dict(T=jeu.LANGUES["fr"], state=STATE, current_boss="Ignivor", bosses=jeu.GAME.bosses),
+    "fight_action": dict(T=jeu.LANGUES["fr"], boss=jeu.GAME.bosses[1], pokemon=STATE["collection"][0], combat=COMBAT,
+                         auto_heal_below=jeu.AUTO_HEAL_BELOW),
+    "sell": dict(T=jeu.LANGUES["fr"], state=STATE, msg="", enumerate=enumerate, species=jeu.GAME.by_name),
+}
+
+def per_call(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e6
+
+def main(n=2000):
+    with jeu.create_app().test_request_context():
+        print(f"{'page':<14}{'avant (µs)':>12}{'après (µs)':>12}{'gain':>8}")
+        for name, ctx in CASES.items():
+            source = jeu.PAGES[f"{name}.html"]
+            before = per_call(lambda: render_template_string(source, **ctx), n)
+            after = per_call(lambda: jeu.render_page(name, **ctx), n)
+            print(f"{name:<14}{before:>12.1f}{after:>12.1f}{before / after:>7.1f}x")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
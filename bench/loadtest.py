@@ -0,0 +1,144 @@
+"""Test de charge : des joueurs virtuels enchaînent de vrais parcours de jeu.
+
+Chaque joueur (un thread) choisit sa langue, crée son compte, se connecte, puis
+répète des tours : boosters, soin, combat complet (/fight puis /fight_action
+jusqu'à la fin, /fight_result), vente, sauvegarde. Rapport : p50/p95/p99 par
+route et requêtes/s globales. C'est la référence pour juger chaque optimisation.
+
+    python bench/loadtest.py                                  # en processus (client de test Flask)
+    python bench/loadtest.py --url http://127.0.0.1:8000      # contre un serveur lancé à part
+    python bench/loadtest.py --players 50 --duration 60 --think 0.2
+"""
+import argparse, http.cookiejar, os, random, sys, tempfile, threading, time, urllib.error, urllib.parse, urllib.request
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestClient:
+    """Routes appelées en processus, sans réseau ; un client (cookies) par joueur."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, data=None):
+        return self.client.open(path, method=method, data=data).status_code
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args):
+        return None  # chaque route est mesurée seule : on ne suit pas les 302
+
+
+class HTTPClient:
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect())
+
+    def request(self, method, path, data=None):
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        req = urllib.request.Request(self.base_url + path, data=body, method=method,
+                                     headers={"Accept-Encoding": "gzip"})
+        try:
+            with self.opener.open(req, timeout=30) as resp:
+                resp.read()
+                return resp.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+        except OSError:
+            return 599  # délai dépassé / connexion refusée : compté comme erreur
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.journeys = 0
+        self._lock = threading.Lock()
+
+    def record(self, route, seconds, status):
+        with self._lock:
+            self.latencies[route].append(seconds)
+            if status >= 400:
+                self.errors[route] += 1
+
+    def report(self, elapsed):
+        def pct(values, p):
+            return values[min(len(values) - 1, int(p / 100 * len(values)))] * 1000
+
+        total = sum(len(v) for v in self.latencies.values())
+        print(f"{'route':<22}{'req':>8}{'err':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+        for route, values in sorted(self.latencies.items()):
+            values.sort()
+            print(f"{route:<22}{len(values):>8}{self.errors[route]:>6}{pct(values, 50):>9.1f}"
+                  f"{pct(values, 95):>9.1f}{pct(values, 99):>9.1f}{values[-1] * 1000:>9.1f}")
+        print(f"\n{total} requêtes en {elapsed:.1f}s : {total / elapsed:.1f} req/s, "
+              f"{self.journeys} tours de jeu, {sum(self.errors.values())} erreurs")
+
+
+def player(client, name, stats, deadline, think, fight_turns):
+    def call(method, path, data=None, route=None):
+        start = time.perf_counter()
+        status = client.request(method, path, data)
+        stats.record(route or f"{method} {path}", time.perf_counter() - start, status)
+        if think:
+            time.sleep(random.uniform(0, 2 * think))
+        return status
+
+    call("POST", "/", {"lang": random.choice(["fr", "en", "ru"])})
+    call("POST", "/signup", {"username": name, "password": "loadtest"})
+    call("POST", "/login", {"username": name, "password": "loadtest"})
+    while time.monotonic() < deadline:
+        call("GET", "/menu")
+        for _ in range(2):
+            call("POST", "/booster")
+        call("POST", "/heal_team")
+        call("GET", "/fight")
+        call("POST", "/fight", {"pokemon_idx": "0"})
+        for _ in range(fight_turns):
+            # 302 : combat terminé (ou aucun combat en cours)
+            if call("POST", "/fight_action", {"action": random.choice(["attack", "attack", "heal"])}) == 302:
+                break
+        call("GET", "/fight_result")
+        call("POST", "/sell", {"index": "0"})
+        call("GET", "/save")
+        with stats._lock:
+            stats.journeys += 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="serveur à tester ; sinon l'app tourne en processus")
+    parser.add_argument("--players", type=int, default=10, help="joueurs simultanés (threads)")
+    parser.add_argument("--duration", type=float, default=20.0, help="secondes de jeu par joueur")
+    parser.add_argument("--think", type=float, default=0.0, help="temps de réflexion moyen entre deux requêtes (s)")
+    parser.add_argument("--fight-turns", type=int, default=60, help="tours max par combat")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        make_client = lambda: HTTPClient(args.url)
+    else:
+        # App isolée dans un dossier temporaire, configuration par défaut (variables POKEMON_* respectées)
+        os.chdir(tempfile.mkdtemp(prefix="loadtest-"))
+        from Qwen_python_20260113_llvcbh3vy import create_app
+        app = create_app()
+        make_client = lambda: TestClient(app)
+
+    stats = Stats()
+    run = f"{int(time.time()) % 100000}{random.randrange(1000)}"
+    start = time.monotonic()
+    deadline = start + args.duration
+    threads = [threading.Thread(target=player, args=(make_client(), f"load{run}_{i}", stats, deadline,
+                                                     args.think, args.fight_turns))
+               for i in range(args.players)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats.report(time.monotonic() - start)
+
+
+if __name__ == "__main__":
+    main()
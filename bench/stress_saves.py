@@ -0,0 +1,97 @@
+"""Test de charge : sauvegardes concurrentes depuis plusieurs processus et threads.
+
+Chaque processus ouvre ses propres Backends sur le même dossier de sauvegardes
+(comme des workers gunicorn) et écrit en boucle les mêmes joueurs pendant que
+des lecteurs relisent les fichiers. À la fin, on vérifie qu'aucun fichier n'est
+tronqué ou illisible et que chaque joueur contient bien l'état le plus récent.
+
+    python bench/stress_saves.py [processus] [threads] [secondes] [joueurs]
+"""
+import json, multiprocessing, os, sys, tempfile, threading, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Qwen_python_20260113_llvcbh3vy import Backends, DEFAULT_CONFIG
+from save_layout import ShardedLayout
+
+def config(root):
+    return {**DEFAULT_CONFIG, "SAVES_DIR": os.path.join(root, "saves"), "USERS_DB": os.path.join(root, "users.db"),
+            "USERS_FILE": os.path.join(root, "users.json"), "SAVE_CACHE_SIZE": 0, "PASSWORD_ITERATIONS": 1000}
+
+def worker(root, threads, seconds, users, results):
+    backends = Backends(config(root))
+    newest = {}   # joueur -> (stamp, marqueur) le plus récent écrit par ce processus
+    lock = threading.Lock()
+    errors = [0]
+    deadline = time.monotonic() + seconds
+
+    def writer(t):
+        i = 0
+        while time.monotonic() < deadline:
+            user = f"joueur{i % users}"
+            stamp = time.time_ns()
+            mark = f"{os.getpid()}-{t}-{i}"
+            # Collection volumineuse : une écriture non atomique se verrait tout de suite
+            data = {"argent": i, "boss_actuel": 0, "mark": mark,
+                    "collection": [{"nom": "Mew", "pv": 170, "pv_max": 170, "attaque": 75,
+                                    "rarete": "Mythique", "niveau": n, "xp": 0} for n in range(200)]}
+            backends.write_save(user, data, stamp)
+            with lock:
+                if stamp > newest.get(user, (0,))[0]:
+                    newest[user] = (stamp, mark)
+            i += 1
+
+    def reader():
+        while time.monotonic() < deadline:
+            for u in range(users):
+                f = backends.save_path(f"joueur{u}", "json")
+                try:
+                    json.load(open(f, encoding='utf-8'))
+                except FileNotFoundError:
+                    pass
+                except ValueError:
+                    errors[0] += 1
+
+    pool = [threading.Thread(target=writer, args=(t,)) for t in range(threads)] + [threading.Thread(target=reader)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    results.put((newest, errors[0]))
+
+def main(processes=4, threads=4, seconds=5.0, users=8):
+    root = tempfile.mkdtemp(prefix="stress-saves-")
+    results = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=worker, args=(root, threads, seconds, users, results)) for _ in range(processes)]
+    for p in procs:
+        p.start()
+    outcomes = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    newest, read_errors = {}, sum(e for _, e in outcomes)
+    for partial, _ in outcomes:
+        for user, entry in partial.items():
+            if entry[0] > newest.get(user, (0,))[0]:
+                newest[user] = entry
+    saves_dir = config(root)["SAVES_DIR"]
+    layout = ShardedLayout(saves_dir)
+    corrupted = stale = 0
+    for user, (stamp, mark) in newest.items():
+        try:
+            data = json.load(open(layout.path(user, ".json"), encoding='utf-8'))
+        except ValueError:
+            corrupted += 1
+            continue
+        stale += data["mark"] != mark
+    leftovers = [f for _, _, files in os.walk(saves_dir) for f in files if f.startswith(".tmp-")]
+    print(f"{processes} processus x {threads} threads, {seconds}s, {users} joueurs ({root})")
+    print(f"lectures illisibles: {read_errors}  fichiers corrompus: {corrupted}  "
+          f"états périmés: {stale}  temporaires restants: {len(leftovers)}")
+    if read_errors or corrupted or stale or leftovers:
+        sys.exit(1)
+    print("OK")
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(*(int(args[0]) if args[0:1] else 4, int(args[1]) if args[1:2] else 4,
+           float(args[2]) if args[2:3] else 5.0, int(args[3]) if args[3:4] else 8))
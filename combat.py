@@ -0,0 +1,201 @@
+"""Moteur de combat pur : un état compact et ``step(state, action, rng)``, sans Flask.
+
+Utilisé par les routes de combat, et ses constantes par le simulateur. ``rng``
+est n'importe quel objet compatible ``random`` (randint / choice) ; ``boss`` est
+un ``game_data.Boss``.
+
+Chaque combat a son propre flux aléatoire (rng.CounterRNG) : seed et compteur
+sont gardés dans l'état avec la liste des actions jouées, si bien que
+``replay`` rejoue n'importe quel combat à l'identique (débogage, anti-triche).
+"""
+from rng import CounterRNG, new_seed
+
+CRIT_CHANCE = 15        # %
+CRIT_MULT = 1.5
+HEAL_RATIO = 0.45
+BOSS_HEAL_CHANCE = 20   # %
+DMG_SPREAD = 5
+DEFEAT_REWARD = 25
+LOG_SIZE = 5            # lignes de journal affichées
+AUTO_MAX_TURNS = 200    # au-delà, le combat auto est perdu (abandon)
+
+
+class CombatState:
+    __slots__ = ("boss_pokemon", "boss_pv", "boss_pv_max", "boss_atk",
+                 "pokemon_idx", "nom", "pv", "pv_max", "attaque", "log",
+                 "boss_id", "seed", "counter", "pv_start", "actions")
+
+    def __init__(self, boss_pokemon, boss_pv, boss_pv_max, boss_atk, pokemon_idx, nom, pv, pv_max, attaque, log=None,
+                 boss_id=None, seed=None, counter=0, pv_start=None, actions=None):
+        self.boss_pokemon = boss_pokemon
+        self.boss_pv = boss_pv
+        self.boss_pv_max = boss_pv_max
+        self.boss_atk = boss_atk
+        self.pokemon_idx = pokemon_idx  # index dans state['collection']
+        self.nom = nom
+        self.pv = pv
+        self.pv_max = pv_max
+        self.attaque = attaque
+        self.log = log if log is not None else []
+        # De quoi rejouer le combat : boss, PV de départ, flux aléatoire et actions jouées
+        self.boss_id = boss_id
+        self.seed = new_seed() if seed is None else seed
+        self.counter = counter
+        self.pv_start = pv if pv_start is None else pv_start
+        self.actions = actions if actions is not None else []
+
+    def to_dict(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(**d)
+
+    def public_dict(self):
+        """État sans le flux aléatoire : connaître seed et compteur permettrait de prédire les tirages."""
+        return {k: getattr(self, k) for k in self.__slots__ if k not in ("seed", "counter")}
+
+    def rng(self):
+        return CounterRNG(self.seed, self.counter)
+
+    def record(self):
+        """Le strict nécessaire pour rejouer le combat avec ``replay``."""
+        return {"boss_id": self.boss_id, "pokemon_idx": self.pokemon_idx, "seed": self.seed, "actions": self.actions,
+                "pokemon": {"nom": self.nom, "pv": self.pv_start, "pv_max": self.pv_max, "attaque": self.attaque}}
+
+    @property
+    def finished(self):
+        return self.pv <= 0 or self.boss_pv <= 0
+
+    @property
+    def won(self):
+        return self.boss_pv <= 0
+
+
+def start(boss, pokemon, pokemon_idx, seed=None):
+    """Nouveau combat ; tous ses tirages viennent du flux `seed` (aléatoire si None)."""
+    rng = CounterRNG(seed)
+    species = rng.choice(boss.pokemon)
+    boss_pv = species.pv + boss.niveau * 10
+    return CombatState(species.nom, boss_pv, boss_pv, species.attaque + boss.niveau * 2,
+                       pokemon_idx, pokemon['nom'], pokemon['pv'], pokemon['pv_max'], pokemon['attaque'],
+                       boss_id=boss.id, seed=rng.seed_value, counter=rng.counter)
+
+
+def _damage(atk, rng):
+    dmg = rng.randint(atk - DMG_SPREAD, atk + DMG_SPREAD)
+    if rng.randint(1, 100) <= CRIT_CHANCE:
+        return int(dmg * CRIT_MULT), True
+    return dmg, False
+
+
+def step(state, action, rng):
+    """Joue un tour ("attack" ou "heal") puis la riposte du boss. Ne modifie que `state`.
+    ValueError si le combat est déjà terminé (un soin ne ranime pas un Pokémon K.O.)."""
+    if state.finished:
+        raise ValueError("Combat déjà terminé")
+    log = state.log
+    if action == "attack":
+        dmg, crit = _damage(state.attaque, rng)
+        log.append(f"💥 {state.nom} CRITIQUE: -{dmg}" if crit else f"⚔️ {state.nom}: -{dmg}")
+        state.boss_pv -= dmg
+    elif action == "heal":
+        heal = int(state.pv_max * HEAL_RATIO)
+        state.pv = min(state.pv_max, state.pv + heal)
+        log.append(f"💚 {state.nom}: +{heal} HP")
+
+    if state.boss_pv > 0:
+        if rng.randint(1, 100) <= BOSS_HEAL_CHANCE:
+            heal = int(state.boss_pv_max * HEAL_RATIO)
+            state.boss_pv = min(state.boss_pv_max, state.boss_pv + heal)
+            log.append(f"💚 Boss: +{heal} HP")
+        else:
+            dmg, crit = _damage(state.boss_atk, rng)
+            log.append(f"⚡ Boss CRITIQUE: -{dmg}" if crit else f"🔥 Boss: -{dmg}")
+            state.pv -= dmg
+    return state
+
+
+def heal_below(ratio):
+    """Politique simple : se soigne sous `ratio` des PV max, sinon attaque."""
+    return lambda state: "heal" if state.pv < state.pv_max * ratio else "attack"
+
+
+def auto_battle(state, policy, rng, max_turns=AUTO_MAX_TURNS):
+    """Enchaîne les tours choisis par `policy(state)` jusqu'à la fin du combat."""
+    for _ in range(max_turns):
+        if state.finished:
+            break
+        step(state, policy(state), rng)
+    return state
+
+
+def act(state, action, heal_ratio=None):
+    """Joue `action` ("attack", "heal" ou "auto" jusqu'à la fin) sur le flux du combat et l'enregistre.
+    ValueError si le combat est déjà terminé."""
+    if state.finished:
+        raise ValueError("Combat déjà terminé")
+    rng = state.rng()
+    if action == "auto":
+        auto_battle(state, heal_below(heal_ratio), rng)
+        if not state.finished:
+            state.pv = 0  # AUTO_MAX_TURNS atteint : abandon, le combat est perdu
+            state.log.append(f"🏳️ {state.nom} abandonne")
+        state.actions.append(["auto", heal_ratio])
+    else:
+        step(state, action, rng)
+        state.actions.append(action)
+    state.counter = rng.counter
+    return state
+
+
+def replay(boss, record):
+    """Rejoue un combat depuis son ``record()`` (seed, Pokémon de départ, actions)."""
+    state = start(boss, record["pokemon"], record["pokemon_idx"], record["seed"])
+    for action in record["actions"]:
+        if isinstance(action, list):
+            act(state, *action)
+        else:
+            act(state, action)
+    return state
+
+
+def finish(state, pokemon, boss):
+    """Applique l'issue du combat au Pokémon (XP / niveau, ou récupération). Retourne (victoire, gain).
+    ValueError si le combat n'est pas terminé (pas de récompense sans avoir joué)."""
+    if not state.finished:
+        raise ValueError("Combat pas terminé")
+    if not state.won:
+        pokemon['pv'] = max(1, int(pokemon['pv_max'] * 0.25))  # récupère un peu
+        return False, DEFEAT_REWARD
+    pokemon['xp'] += boss.niveau * 50
+    # Vérifier montée de niveau
+    if pokemon['xp'] >= pokemon['niveau'] * 100:
+        pokemon['niveau'] += 1
+        pokemon['xp'] = 0
+        pokemon['attaque'] += 3
+        pokemon['pv_max'] += 10
+        pokemon['pv'] = pokemon['pv_max']
+    return True, boss.recompense
+
+
+if __name__ == "__main__":
+    # python combat.py '<record JSON>'   rejoue un combat enregistré
+    # python combat.py <joueur> [n]      rejoue son n-ième combat en partant du plus récent (défaut 1),
+    #                                    lu dans son journal d'événements (champ "record" de fight_result)
+    import json, os, sys
+    from game_data import load
+    if sys.argv[1].startswith("{"):
+        record = json.loads(sys.argv[1])
+    else:
+        from Qwen_python_20260113_llvcbh3vy import DEFAULT_CONFIG
+        from events import EventLog
+        log = EventLog(os.path.join(DEFAULT_CONFIG["SAVES_DIR"], "events"))
+        records = [e["record"] for e in log.history(sys.argv[1]) if e["e"] == "fight_result" and "record" in e]
+        n = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+        if len(records) < n:
+            sys.exit(f"{len(records)} combat(s) enregistré(s) pour {sys.argv[1]}")
+        record = records[-n]
+    state = replay(load().bosses[record["boss_id"]], record)
+    print("\n".join(state.log))
+    print(f"{'Victoire' if state.won else 'Défaite'} : {state.nom} {state.pv} PV, boss {state.boss_pv} PV")
@@ -0,0 +1,58 @@
+"""Compression gzip / brotli des réponses texte, au-delà d'une taille minimale.
+
+brotli est optionnel : sans le module, seul gzip est proposé. Les réponses figées
+(pages prérendues) sont compressées une fois avec precompress, puis servies avec
+serve_precompressed sans repasser par gzip / brotli.
+"""
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = ("text/html", "text/css", "text/plain", "application/json")
+OFFERS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def _compress(data, encoding, level):
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level)
+
+
+def compress_response(request, response, min_size=500, level=6):
+    if (response.direct_passthrough or response.status_code != 200
+            or "Content-Encoding" in response.headers or response.mimetype not in COMPRESSIBLE):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = request.accept_encodings.best_match(OFFERS)
+    data = response.get_data()
+    if encoding is None or len(data) < min_size:
+        return response
+    response.set_data(_compress(data, encoding, level))
+    response.headers["Content-Encoding"] = encoding
+    # Un ETag fort désigne une représentation exacte : il devient faible une fois compressé
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def precompress(data, min_size=500, level=6):
+    """{encodage: octets} de `data` pour chaque encodage proposé ("identity" toujours présent)."""
+    variants = {"identity": data}
+    if len(data) >= min_size:
+        for encoding in OFFERS:
+            variants[encoding] = _compress(data, encoding, level)
+    return variants
+
+
+def serve_precompressed(request, response, variants):
+    """Remplit `response` avec la variante acceptée par le client ; compress_response la laisse telle quelle."""
+    response.vary.add("Accept-Encoding")
+    encoding = request.accept_encodings.best_match([e for e in OFFERS if e in variants])
+    response.set_data(variants[encoding or "identity"])
+    if encoding is not None:
+        response.headers["Content-Encoding"] = encoding
+    return response
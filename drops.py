@@ -0,0 +1,40 @@
+"""Tables de tirage pondérées, échantillonnées en O(1) par la méthode des alias (Vose).
+
+    table = DropTable({"Pikachu": 25, "Mew": 2}, seed=42)
+    table.draw()           # générateur propre à la table (reproductible si seed donné)
+    table.draw(rng)        # ou n'importe quel objet compatible ``random``
+"""
+import random
+
+
+class DropTable:
+    def __init__(self, weights, seed=None):
+        """`weights` : {objet: poids > 0} ; les poids n'ont pas besoin de sommer à 100."""
+        items = list(weights)
+        total = sum(weights.values())
+        if not items or any(w <= 0 for w in weights.values()):
+            raise ValueError("Table de tirage vide ou poids non positif")
+        n = len(items)
+        scaled = [weights[item] * n / total for item in items]
+        prob, alias = [1.0] * n, list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s], alias[s] = scaled[s], l
+            scaled[l] -= 1 - scaled[s]
+            (small if scaled[l] < 1 else large).append(l)
+        # Les restes valent 1 aux erreurs d'arrondi près : prob reste à 1.0
+        self.items = tuple(items)
+        self.probabilities = {item: weights[item] / total for item in items}
+        self._prob = tuple(prob)
+        self._alias = tuple(alias)
+        self._rng = random.Random(seed)
+
+    def draw(self, rng=None):
+        u = (rng or self._rng).random() * len(self.items)
+        i = int(u)
+        return self.items[i if u - i < self._prob[i] else self._alias[i]]
+
+    def draw_many(self, n, rng=None):
+        return [self.draw(rng) for _ in range(n)]
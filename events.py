@@ -0,0 +1,162 @@
+"""Journal d'événements par joueur, en ajout seul, au-dessus des sauvegardes.
+
+Chaque action qui modifie l'état ajoute une ligne JSON ``{"t": stamp_ns, "e": type, ...}``
+au journal actif du joueur (``<hash>.log``, rangé en éclats par save_layout) :
+quelques octets au lieu de réécrire toute la sauvegarde. La sauvegarde (écrite
+par le saver) sert d'instantané : au chargement, on part de l'instantané et on
+rejoue les événements plus récents que son mtime.
+
+Quand le journal actif dépasse ``compact_bytes``, l'écriture d'un instantané y
+retire les événements qu'il contient déjà et les déplace dans
+``<hash>.archive.log``, qui reste la piste d'audit complète.
+
+Les événements qui changent la composition de l'équipe (booster, sell) portent la
+collection qui en résulte : les rejouer deux fois, ou après ceux d'un autre
+client connecté au même compte, donne toujours un état cohérent.
+
+L'appelant tient le verrou du joueur (storage.locked) autour de append / compact.
+"""
+import json, logging, os
+from save_layout import ShardedLayout
+from storage import atomic_write_bytes
+
+log = logging.getLogger(__name__)
+
+
+def _booster(state, e):
+    state['argent'] = e['argent']
+    if 'collection' in e:
+        state['collection'] = e['collection']
+    else:
+        state['collection'].extend(e['added'])  # journaux antérieurs à "collection"
+
+def _sell(state, e):
+    if 'collection' in e:
+        state['collection'] = e['collection']
+    else:
+        state['collection'].pop(e['idx'])
+    state['argent'] = e['argent']
+
+def _heal_team(state, e):
+    state['argent'] = e['argent']
+    for p in state['collection']:
+        p['pv'] = p['pv_max']
+
+def _fight_turn(state, e):
+    state['collection'][e['idx']]['pv'] = e['pv']
+
+def _fight_result(state, e):
+    state['collection'][e['idx']] = e['pokemon']
+    state['argent'] = e['argent']
+    state['boss_actuel'] = e['boss_actuel']
+
+APPLY = {"booster": _booster, "sell": _sell, "heal_team": _heal_team,
+         "fight_turn": _fight_turn, "fight_result": _fight_result}
+
+
+def apply(state, events):
+    """Rejoue `events` (dans l'ordre) sur `state`, modifié en place. Un événement qui ne
+    s'applique pas (indice disparu, type inconnu...) est ignoré et journalisé : la reprise
+    ne doit jamais empêcher un joueur de se connecter."""
+    for e in events:
+        try:
+            APPLY[e['e']](state, e)
+        except (KeyError, IndexError, TypeError):
+            log.warning("Événement ignoré au rejeu : %r", e)
+    return state
+
+
+class EventLog:
+    def __init__(self, directory, compact_bytes=64 * 1024):
+        self.layout = ShardedLayout(directory)
+        self.legacy_dir = directory  # ancien format plat <user>.log, lu tant qu'il n'est pas migré
+        self.legacy = True
+        self.compact_bytes = compact_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, user, create=False):
+        return self.layout.path(user, ".log", create)
+
+    def archive_path(self, user):
+        return self.layout.path(user, ".archive.log", create=True)
+
+    def append(self, user, stamp, event):
+        line = json.dumps({"t": stamp, **event}, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with open(self.path(user, create=True), "a", encoding="utf-8") as f:
+            f.write(line)
+
+    def legacy_path(self, user):
+        return os.path.join(self.legacy_dir, f"{user}.log")
+
+    def _lines(self, user):
+        paths = [self.path(user)]
+        if self.legacy:
+            paths.insert(0, self.legacy_path(user))
+        lines = []
+        for path in paths:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    lines.extend(f.readlines())
+            except FileNotFoundError:
+                pass
+        return lines
+
+    def version(self, user):
+        """(inode, taille, mtime) des journaux actifs du joueur : change à chaque ajout ou compactage."""
+        paths = [self.legacy_path(user), self.path(user)] if self.legacy else [self.path(user)]
+        stamps = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+                stamps.append((st.st_ino, st.st_size, st.st_mtime_ns))
+            except FileNotFoundError:
+                stamps.append(None)
+        return tuple(stamps)
+
+    def read(self, user, after=0):
+        """Événements strictement postérieurs à `after` (ns), dans l'ordre d'ajout."""
+        events = []
+        for line in self._lines(user):
+            try:
+                e = json.loads(line)
+            except ValueError:
+                continue  # dernière ligne tronquée par un crash en pleine écriture
+            if e['t'] > after:
+                events.append(e)
+        return events
+
+    def history(self, user):
+        """Tous les événements du joueur, archive comprise (audit, rejeu des combats)."""
+        events = []
+        try:
+            with open(self.layout.path(user, ".archive.log"), encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            lines = []
+        for line in lines + self._lines(user):
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+        return events
+
+    def compact(self, user, stamp):
+        """Archive les événements déjà couverts par l'instantané `stamp`, si le journal est assez gros."""
+        try:
+            if os.path.getsize(self.path(user)) < self.compact_bytes:
+                return
+        except FileNotFoundError:
+            return
+        if self.legacy and os.path.exists(self.legacy_path(user)):
+            return  # ancien journal plat pas encore migré : save_layout.migrate_flat le fusionnera
+        old, live = [], []
+        for line in self._lines(user):
+            try:
+                (old if json.loads(line)['t'] <= stamp else live).append(line)
+            except ValueError:
+                continue
+        with open(self.archive_path(user), "a", encoding="utf-8") as f:
+            f.writelines(old)
+            f.flush()
+            os.fsync(f.fileno())
+        atomic_write_bytes(self.path(user), "".join(live).encode("utf-8"))
@@ -0,0 +1,158 @@
+"""Données de jeu statiques : chargées une fois, validées, figées en tables indexées.
+
+Les espèces sont numérotées dans l'ordre de la table (``species[id]``) ; ces
+ids servent aussi aux sauvegardes binaires, donc on ajoute en fin sans
+jamais réordonner. Les valeurs dérivées (attaque à la sortie d'un booster,
+prix de revente, table de tirage des boosters) sont calculées ici, une fois
+pour toutes.
+
+Un fichier JSON (ou TOML) peut remplacer tout ou partie des tables par défaut :
+
+    {"pokemon": {"Pikachu": {"pv": 100, "attaque": 30, "rarete": "Commun"}, ...},
+     "bosses": [{"nom": "Nerkael", "pokemon": ["Pikachu"], "recompense": 150, "niveau": 3}],
+     "prix_vente": {"Commun": 40, ...}, "bonus_atk": {"Commun": 0, ...},
+     "booster": [{"pokemon": ["Pikachu", "Évoli"], "taux": 50}, ...]}
+
+Dans ``booster``, chaque palier a un taux (poids relatif) partagé à parts
+égales entre ses Pokémon.
+"""
+import json
+from types import MappingProxyType
+from typing import NamedTuple
+from drops import DropTable
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+DEFAULT_DATA = {
+    "pokemon": {
+        "Pikachu": {"pv": 100, "attaque": 30, "rarete": "Commun"},
+        "Évoli": {"pv": 120, "attaque": 25, "rarete": "Commun"},
+        "Lucario": {"pv": 130, "attaque": 35, "rarete": "Rare"},
+        "Dracolosse": {"pv": 150, "attaque": 40, "rarete": "Rare"},
+        "Metalosse": {"pv": 140, "attaque": 45, "rarete": "Épique"},
+        "Tyranocif": {"pv": 150, "attaque": 50, "rarete": "Épique"},
+        "Dracaufeu": {"pv": 160, "attaque": 45, "rarete": "Mythique"},
+        "Mew": {"pv": 170, "attaque": 50, "rarete": "Mythique"},
+    },
+    "bosses": [
+        {"nom": "Nerkael", "pokemon": ["Pikachu", "Évoli"], "recompense": 150, "niveau": 3},
+        {"nom": "Ignivor", "pokemon": ["Lucario", "Dracolosse"], "recompense": 300, "niveau": 5},
+        {"nom": "Aquarion", "pokemon": ["Metalosse", "Tyranocif"], "recompense": 500, "niveau": 8},
+        {"nom": "Terragon", "pokemon": ["Dracaufeu", "Mew"], "recompense": 1000, "niveau": 12},
+        {"nom": "Pyrodraco", "pokemon": ["Dracaufeu", "Mew"], "recompense": 1000000, "niveau": 20},
+    ],
+    "prix_vente": {"Commun": 40, "Rare": 120, "Épique": 300, "Mythique": 800},
+    "bonus_atk": {"Commun": 0, "Rare": 5, "Épique": 12, "Mythique": 25},
+    "booster": [
+        {"pokemon": ["Pikachu", "Évoli"], "taux": 50},
+        {"pokemon": ["Lucario", "Dracolosse"], "taux": 20},
+        {"pokemon": ["Metalosse", "Tyranocif"], "taux": 20},
+        {"pokemon": ["Dracaufeu"], "taux": 8},
+        {"pokemon": ["Mew"], "taux": 2},
+    ],
+}
+
+
+class GameDataError(ValueError):
+    pass
+
+
+class Species(NamedTuple):
+    id: int
+    nom: str
+    pv: int
+    attaque: int
+    rarete: str
+    rarete_id: int
+    booster_atk: int   # attaque à la sortie d'un booster (attaque + bonus de rareté)
+    prix_vente: int
+
+
+class Boss(NamedTuple):
+    id: int
+    nom: str
+    pokemon: tuple     # de Species
+    recompense: int
+    niveau: int
+
+
+class GameData(NamedTuple):
+    species: tuple           # Species, indexées par id
+    by_name: MappingProxyType  # nom -> Species
+    rarities: tuple          # noms de rareté, indexés par rarete_id
+    bosses: tuple            # Boss, dans l'ordre de progression
+    booster: DropTable       # tirage d'une Species par booster
+    booster_tiers: tuple     # (tuple de Species, taux) tels que configurés
+
+
+def _positive_int(value, what, minimum=1):
+    if not isinstance(value, int) or isinstance(value, bool) or value < minimum:
+        raise GameDataError(f"{what}: entier >= {minimum} attendu, reçu {value!r}")
+    return value
+
+
+def build(data):
+    """Valide les tables brutes et les fige en GameData."""
+    prix, bonus = data["prix_vente"], data["bonus_atk"]
+    if prix.keys() != bonus.keys():
+        raise GameDataError(f"Raretés différentes entre prix_vente et bonus_atk: {sorted(prix.keys() ^ bonus.keys())}")
+    rarities = tuple(prix)
+    rarity_id = {r: i for i, r in enumerate(rarities)}
+    for r in rarities:
+        _positive_int(prix[r], f"prix_vente[{r}]", 0)
+        _positive_int(bonus[r], f"bonus_atk[{r}]", 0)
+
+    species = []
+    for i, (nom, s) in enumerate(data["pokemon"].items()):
+        if s.get("rarete") not in rarity_id:
+            raise GameDataError(f"{nom}: rareté inconnue {s.get('rarete')!r}")
+        pv = _positive_int(s.get("pv"), f"{nom}.pv")
+        attaque = _positive_int(s.get("attaque"), f"{nom}.attaque")
+        species.append(Species(i, nom, pv, attaque, s["rarete"], rarity_id[s["rarete"]],
+                               attaque + bonus[s["rarete"]], prix[s["rarete"]]))
+    if not species:
+        raise GameDataError("Aucune espèce de Pokémon")
+    by_name = {s.nom: s for s in species}
+
+    bosses = []
+    for i, b in enumerate(data["bosses"]):
+        nom = b.get("nom") or f"boss #{i}"
+        unknown = [p for p in b.get("pokemon", ()) if p not in by_name]
+        if unknown or not b.get("pokemon"):
+            raise GameDataError(f"{nom}: Pokémon inconnus ou absents {unknown}")
+        bosses.append(Boss(i, nom, tuple(by_name[p] for p in b["pokemon"]),
+                           _positive_int(b.get("recompense"), f"{nom}.recompense", 0),
+                           _positive_int(b.get("niveau"), f"{nom}.niveau")))
+
+    tiers, weights = [], {}
+    for i, tier in enumerate(data["booster"]):
+        unknown = [p for p in tier.get("pokemon", ()) if p not in by_name]
+        if unknown or not tier.get("pokemon"):
+            raise GameDataError(f"booster[{i}]: Pokémon inconnus ou absents {unknown}")
+        taux = tier.get("taux")
+        if not isinstance(taux, (int, float)) or isinstance(taux, bool) or taux <= 0:
+            raise GameDataError(f"booster[{i}].taux: nombre > 0 attendu, reçu {taux!r}")
+        group = tuple(by_name[p] for p in tier["pokemon"])
+        tiers.append((group, taux))
+        for s in group:
+            weights[s] = weights.get(s, 0) + taux / len(group)
+    return GameData(tuple(species), MappingProxyType(by_name), rarities, tuple(bosses),
+                    DropTable(weights), tuple(tiers))
+
+
+def load(path=None):
+    """Tables par défaut, complétées/remplacées par celles du fichier `path` (JSON ou TOML)."""
+    data = dict(DEFAULT_DATA)
+    if path:
+        if path.endswith(".toml"):
+            if tomllib is None:
+                raise GameDataError("Fichier TOML : Python 3.11+ requis (tomllib)")
+            with open(path, "rb") as f:
+                data.update(tomllib.load(f))
+        else:
+            with open(path, encoding="utf-8") as f:
+                data.update(json.load(f))
+    return build(data)
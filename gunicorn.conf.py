@@ -0,0 +1,16 @@
+# Configuration gunicorn (voir wsgi.py pour les variables d'environnement)
+import multiprocessing, os
+
+bind = os.environ.get("POKEMON_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("POKEMON_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+# "gthread" avec wsgi:app, "asgi" (boucle asyncio, voir asgi.py) avec asgi:app
+worker_class = os.environ.get("POKEMON_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("POKEMON_THREADS", 4)) if worker_class == "gthread" else 1
+# Connexions simultanées par worker, keep-alive inactives comprises
+worker_connections = int(os.environ.get("POKEMON_CONNECTIONS", 10000))
+# Pas de preload : chaque worker ouvre ses connexions SQLite et lance son thread de sauvegarde
+preload_app = False
+accesslog = "-"
+
+# create_app() vérifie que la configuration tient avec ce nombre de workers
+os.environ["POKEMON_WORKERS"] = str(workers)
@@ -0,0 +1,145 @@
+"""Classements des joueurs (boss vaincus, argent, puissance de l'équipe), tenus à jour au fil du jeu.
+
+Chaque classement est une liste triée de ``(-score, joueur)`` : top-K et rang d'un
+joueur en O(log n) avec sortedcontainers.SortedList ; sans le module, repli sur
+une liste + bisect (même interface, insertion en O(n)).
+
+Chaque worker tient ses listes en mémoire : mises à jour à chaque action de ses
+joueurs, puis publiées avec chaque instantané dans SQLite (``leaderboard.db``,
+une ligne par joueur et un numéro de séquence croissant). Avant de répondre, un
+worker rattrape les lignes publiées par les autres depuis sa dernière lecture ;
+le ``stamp`` (ns) de l'état empêche un score ancien d'en remplacer un plus récent.
+
+    python leaderboard.py rebuild    # recalcule tout depuis les sauvegardes (démarrage à froid)
+"""
+import sys, threading, time
+from bisect import bisect_left, insort
+from storage import SQLiteConnections
+
+try:
+    from sortedcontainers import SortedList
+except ImportError:
+    SortedList = None
+
+BOARDS = ("boss", "argent", "puissance")
+
+
+def scores(state):
+    """(boss vaincus, argent, puissance) ; puissance = somme des PV max et attaques de l'équipe."""
+    return (state["boss_actuel"], state["argent"],
+            sum(p["pv_max"] + p["attaque"] for p in state["collection"]))
+
+
+class _BisectList(list):
+    """Repli sans sortedcontainers : les opérations de SortedList utilisées ici."""
+
+    def add(self, item):
+        insort(self, item)
+
+    def remove(self, item):
+        del self[bisect_left(self, item)]
+
+    def bisect_left(self, item):
+        return bisect_left(self, item)
+
+
+class Leaderboard:
+    def __init__(self, path):
+        self.path = path
+        self._db = SQLiteConnections(path)
+        self._lock = threading.Lock()
+        self._boards = {board: (SortedList or _BisectList)() for board in BOARDS}
+        self._entries = {}    # joueur -> (stamp, scores)
+        self._published = {}  # joueur -> scores déjà écrits par ce worker
+        self._seq = 0
+        with self._db() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS scores (username TEXT PRIMARY KEY, boss INTEGER NOT NULL, "
+                       "argent INTEGER NOT NULL, puissance INTEGER NOT NULL, stamp INTEGER NOT NULL, "
+                       "seq INTEGER NOT NULL)")
+            db.execute("CREATE INDEX IF NOT EXISTS scores_seq ON scores (seq)")
+        self.sync()
+
+    def _set(self, user, stamp, values):
+        # Appelant : self._lock tenu
+        old = self._entries.get(user)
+        if old is not None:
+            if old[0] > stamp:
+                return
+            if old[1] == values:
+                self._entries[user] = (stamp, values)
+                return
+            for board, score in zip(BOARDS, old[1]):
+                self._boards[board].remove((-score, user))
+        self._entries[user] = (stamp, values)
+        for board, score in zip(BOARDS, values):
+            self._boards[board].add((-score, user))
+
+    def update(self, user, state, stamp=None):
+        """Reporte l'état courant du joueur dans ce worker (rien ne bouge si ses scores sont inchangés)."""
+        values = scores(state)
+        with self._lock:
+            self._set(user, stamp or time.time_ns(), values)
+
+    def publish(self, user, state, stamp):
+        """Met à jour puis écrit les scores de l'état `stamp` pour les autres workers."""
+        values = scores(state)
+        with self._lock:
+            self._set(user, stamp, values)
+            if self._published.get(user) == values:
+                return
+        with self._db() as db:
+            db.execute("INSERT INTO scores VALUES (?, ?, ?, ?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM scores)) "
+                       "ON CONFLICT (username) DO UPDATE SET boss = excluded.boss, argent = excluded.argent, "
+                       "puissance = excluded.puissance, stamp = excluded.stamp, seq = excluded.seq "
+                       "WHERE excluded.stamp >= scores.stamp", (user, *values, stamp))
+        with self._lock:
+            self._published[user] = values
+
+    def sync(self):
+        """Rattrape les scores publiés (par tous les workers) depuis la dernière lecture."""
+        rows = self._db().execute("SELECT username, boss, argent, puissance, stamp, seq FROM scores "
+                                  "WHERE seq > ? ORDER BY seq", (self._seq,)).fetchall()
+        with self._lock:
+            for user, boss, argent, puissance, stamp, seq in rows:
+                self._set(user, stamp, (boss, argent, puissance))
+                self._published[user] = (boss, argent, puissance)
+                self._seq = max(self._seq, seq)
+
+    def _entry(self, board, neg, user):
+        # Rang "olympique" : les ex æquo partagent le rang du premier d'entre eux
+        return {"rang": self._boards[board].bisect_left((neg,)) + 1, "joueur": user, "score": -neg}
+
+    def top(self, board, k=10, offset=0):
+        self.sync()
+        with self._lock:
+            return [self._entry(board, neg, user) for neg, user in self._boards[board][offset:offset + k]]
+
+    def rank(self, user, board):
+        """Rang et score du joueur dans `board`, None s'il n'y figure pas."""
+        self.sync()
+        with self._lock:
+            entry = self._entries.get(user)
+            if entry is None:
+                return None
+            return self._entry(board, -entry[1][BOARDS.index(board)], user)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def rebuild(self, users, read):
+        """Recalcule et republie les scores de `users` ; `read(user)` rend l'état courant du joueur."""
+        count = 0
+        for user in users:
+            stamp = time.time_ns()
+            self.publish(user, read(user), stamp)
+            count += 1
+        return count
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit(__doc__)
+    from Qwen_python_20260113_llvcbh3vy import Backends, DEFAULT_CONFIG
+    backends = Backends(DEFAULT_CONFIG)
+    backends.rebuild_leaderboard()
+    print(f"{len(backends.leaderboard)} joueur(s) classé(s)")
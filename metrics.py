@@ -0,0 +1,103 @@
+"""Métriques en mémoire (histogrammes de latence, jauges) au format texte Prometheus.
+
+Assez léger pour rester actif en production : une observation = un bisect et
+un verrou, sans dépendance. Chaque processus worker a son propre registre :
+une collecte de /metrics ne voit que le worker qui répond (Prometheus agrège
+les instances si chacune est collectée séparément).
+
+    metrics = Metrics()
+    with metrics.timer("pokemon_phase_duration_seconds", phase="load_game"):
+        ...
+    metrics.render()   # texte exposé sur /metrics
+"""
+import threading, time
+from bisect import bisect_left
+
+# Secondes : de la milliseconde (lecture en cache) à 10 s (login PBKDF2 sous charge)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+class _Timer:
+    # Classe plutôt que @contextmanager : plusieurs fois moins cher par mesure
+    __slots__ = ("metrics", "name", "key", "start")
+
+    def __init__(self, metrics, name, key):
+        self.metrics, self.name, self.key = metrics, name, key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.metrics._observe(self.name, self.key, time.perf_counter() - self.start)
+
+
+class Metrics:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._histograms = {}  # nom -> {labels triés: [compte par bucket (+Inf en dernier), somme]}
+        self._gauges = []      # fonctions -> [(nom, labels, valeur)], lues à chaque collecte
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name, text):
+        self._help[name] = text
+
+    def observe(self, name, value, **labels):
+        self._observe(name, tuple(sorted(labels.items())), value)
+
+    def _observe(self, name, key, value):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._histograms.get(name)
+            if series is None:
+                series = self._histograms[name] = {}
+            h = series.get(key)
+            if h is None:
+                h = series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            h[0][i] += 1
+            h[1] += value
+
+    def timer(self, name, **labels):
+        """Context manager qui observe la durée du bloc (même s'il lève)."""
+        return _Timer(self, name, tuple(sorted(labels.items())))
+
+    def gauge(self, collect):
+        """`collect()` rend des (nom, {labels}, valeur) : état courant (taille de cache...)."""
+        self._gauges.append(collect)
+        return collect
+
+    def render(self):
+        with self._lock:
+            histograms = {n: {k: (list(h[0]), h[1]) for k, h in s.items()} for n, s in self._histograms.items()}
+        out = []
+
+        def header(name, kind):
+            if name in self._help:
+                out.append(f"# HELP {name} {self._help[name]}")
+            out.append(f"# TYPE {name} {kind}")
+
+        for name, series in sorted(histograms.items()):
+            header(name, "histogram")
+            for key, (counts, total) in sorted(series.items()):
+                labels, cumulative = dict(key), 0
+                for le, count in zip(self.buckets + ("+Inf",), counts):
+                    cumulative += count
+                    out.append(f"{name}_bucket{_labels({**labels, 'le': le})} {cumulative}")
+                out.append(f"{name}_sum{_labels(labels)} {total}")
+                out.append(f"{name}_count{_labels(labels)} {cumulative}")
+        gauges = {}
+        for collect in self._gauges:
+            for name, labels, value in collect():
+                gauges.setdefault(name, []).append((labels, value))
+        for name, series in sorted(gauges.items()):
+            header(name, "gauge")
+            for labels, value in series:
+                out.append(f"{name}{_labels(labels)} {value}")
+        return "\n".join(out) + "\n"
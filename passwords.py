@@ -0,0 +1,57 @@
+"""Hachage des mots de passe : format versionné, coût réglable, concurrence bornée.
+
+Format stocké : ``pbkdf2_sha256$<itérations>$<sel base64>$<hash base64>``.
+Les anciens hash SHA-256 hexadécimaux (sans sel) sont encore acceptés et
+signalés par ``needs_rehash`` pour être remplacés au prochain login réussi.
+"""
+import base64, hashlib, hmac, os, re, threading
+
+ALGORITHM = "pbkdf2_sha256"
+DEFAULT_ITERATIONS = 200_000
+_LEGACY = re.compile(r"[0-9a-f]{64}")
+
+
+def _b64(raw):
+    return base64.b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _unb64(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+class PasswordHasher:
+    def __init__(self, iterations=DEFAULT_ITERATIONS, workers=None):
+        self.iterations = iterations
+        # pbkdf2_hmac libère le GIL : le calcul se fait dans le thread de la requête, qui
+        # attend son résultat, pendant que les autres threads continuent. Le sémaphore borne
+        # le nombre de calculs simultanés (donc le CPU pris par une rafale de logins) ; au-delà,
+        # la requête attend son tour.
+        self._slots = threading.BoundedSemaphore(workers or os.cpu_count() or 2)
+
+    def _hash(self, pw, salt=None, iterations=None):
+        salt = salt or os.urandom(16)
+        iterations = iterations or self.iterations
+        with self._slots:
+            dk = hashlib.pbkdf2_hmac("sha256", pw.encode(), salt, iterations)
+        return f"{ALGORITHM}${iterations}${_b64(salt)}${_b64(dk)}"
+
+    def _verify(self, stored, pw):
+        if _LEGACY.fullmatch(stored):
+            return hmac.compare_digest(stored, hashlib.sha256(pw.encode()).hexdigest())
+        try:
+            algo, iterations, salt, _ = stored.split("$")
+        except ValueError:
+            return False
+        if algo != ALGORITHM:
+            return False
+        return hmac.compare_digest(stored, self._hash(pw, _unb64(salt), int(iterations)))
+
+    def hash(self, pw):
+        return self._hash(pw)
+
+    def verify(self, stored, pw):
+        return self._verify(stored, pw)
+
+    def needs_rehash(self, stored):
+        parts = stored.split("$")
+        return len(parts) != 4 or parts[0] != ALGORITHM or int(parts[1]) != self.iterations
@@ -0,0 +1,43 @@
+"""Flux aléatoires déterministes et légers : tout l'état tient dans (seed, compteur).
+
+Chaque tirage vaut blake2b(compteur, clé=seed) : pas d'état Mersenne Twister de
+2,5 Ko à sauvegarder, pas de générateur global partagé entre threads, et un
+flux repris depuis (seed, compteur) redonne exactement les mêmes tirages.
+Compatible ``random.Random`` (randint, choice, random...).
+"""
+import hashlib, random, secrets
+
+
+def new_seed():
+    return secrets.randbits(64)
+
+
+class CounterRNG(random.Random):
+    def __init__(self, seed=None, counter=0):
+        super().__init__(seed)
+        self.counter = counter
+
+    def seed(self, a=None, version=2):
+        self.seed_value = new_seed() if a is None else a
+        self._key = int(self.seed_value).to_bytes(8, "little")
+        self.counter = 0
+        self.gauss_next = None
+
+    def getrandbits(self, k):
+        blocks = (k + 63) // 64
+        out = 0
+        for _ in range(blocks):
+            digest = hashlib.blake2b(self.counter.to_bytes(8, "little"), key=self._key, digest_size=8).digest()
+            out = out << 64 | int.from_bytes(digest, "little")
+            self.counter += 1
+        return out >> (blocks * 64 - k)
+
+    def random(self):
+        return self.getrandbits(53) * 2 ** -53
+
+    def getstate(self):
+        return self.seed_value, self.counter
+
+    def setstate(self, state):
+        self.seed(state[0])
+        self.counter = state[1]
@@ -0,0 +1,149 @@
+"""Format de sauvegarde binaire compact, décodé paresseusement.
+
+    en-tête   b"PKSV", version (u8), argent (i64), boss_actuel (u16), nb de Pokémon (u16)
+    Pokémon   enregistrements fixes de 20 octets : espèce (u8), rareté (u8),
+              pv (i32), pv_max (i32), attaque (i32), niveau (u16), xp (u32)
+    reste     JSON des autres clés de l'état (vide s'il n'y en a pas)
+
+Espèces et raretés sont stockées par leur indice dans les tables passées au
+codec : ces tables ne doivent qu'être complétées en fin, jamais réordonnées.
+Lire ``argent`` ou ``boss_actuel`` ne décode que l'en-tête ; la collection
+n'est décodée qu'au premier accès.
+
+    python save_format.py to-binary|to-json [dossier]   # convertit les sauvegardes existantes
+"""
+import json, os, struct, sys
+from collections.abc import Mapping
+
+MAGIC = b"PKSV"
+VERSION = 1
+EXTENSIONS = {"json": ".json", "binary": ".sav"}
+_HEADER = struct.Struct("<4sBqHH")
+_RECORD = struct.Struct("<BBiiiHI")
+_FIELDS = ("nom", "rarete", "pv", "pv_max", "attaque", "niveau", "xp")
+_TOP = {"argent", "boss_actuel", "collection"}
+
+
+def is_binary(blob):
+    return blob[:len(MAGIC)] == MAGIC
+
+
+class LazySave(Mapping):
+    """Sauvegarde en lecture seule : en-tête décodé tout de suite, le reste à la demande."""
+
+    def __init__(self, codec, blob):
+        magic, version, argent, boss_actuel, self._count = _HEADER.unpack_from(blob)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Sauvegarde binaire invalide (version {version})")
+        self._codec = codec
+        self._blob = blob
+        self._data = {"argent": argent, "boss_actuel": boss_actuel}
+        self._extra = None
+
+    def _collection(self):
+        if "collection" not in self._data:
+            species, rarities = self._codec.species, self._codec.rarities
+            end = _HEADER.size + self._count * _RECORD.size
+            self._data["collection"] = [
+                {"nom": species[s], "pv": pv, "pv_max": pv_max, "attaque": atk,
+                 "rarete": rarities[r], "niveau": niveau, "xp": xp}
+                for s, r, pv, pv_max, atk, niveau, xp in _RECORD.iter_unpack(self._blob[_HEADER.size:end])]
+        return self._data["collection"]
+
+    def _extras(self):
+        if self._extra is None:
+            tail = self._blob[_HEADER.size + self._count * _RECORD.size:]
+            self._extra = json.loads(tail) if tail else {}
+        return self._extra
+
+    def __getitem__(self, key):
+        if key in self._data:
+            return self._data[key]
+        if key == "collection":
+            return self._collection()
+        return self._extras()[key]
+
+    def __iter__(self):
+        yield from ("argent", "boss_actuel", "collection")
+        yield from self._extras()
+
+    def __len__(self):
+        return 3 + len(self._extras())
+
+    def to_dict(self):
+        """Copie modifiable, entièrement décodée (les listes ne sont pas partagées)."""
+        return {**self._extras(), "argent": self["argent"], "boss_actuel": self["boss_actuel"],
+                "collection": [dict(p) for p in self._collection()]}
+
+
+class SaveCodec:
+    def __init__(self, species, rarities):
+        self.species = tuple(species)
+        self.rarities = tuple(rarities)
+        self._species_id = {nom: i for i, nom in enumerate(self.species)}
+        self._rarity_id = {r: i for i, r in enumerate(self.rarities)}
+
+    def encode(self, state):
+        """bytes de l'état ; ValueError si un Pokémon ne tient pas dans un enregistrement fixe."""
+        collection = state["collection"]
+        out = [_HEADER.pack(MAGIC, VERSION, state["argent"], state["boss_actuel"], len(collection))]
+        for p in collection:
+            if p.keys() != set(_FIELDS):
+                raise ValueError(f"Champs de Pokémon non pris en charge: {sorted(p.keys() ^ set(_FIELDS))}")
+            try:
+                out.append(_RECORD.pack(self._species_id[p["nom"]], self._rarity_id[p["rarete"]],
+                                        p["pv"], p["pv_max"], p["attaque"], p["niveau"], p["xp"]))
+            except (KeyError, struct.error) as e:
+                raise ValueError(f"Pokémon non encodable: {p!r}") from e
+        extra = {k: v for k, v in state.items() if k not in _TOP}
+        if extra:
+            out.append(json.dumps(extra, ensure_ascii=False, separators=(",", ":")).encode())
+        return b"".join(out)
+
+    def decode(self, blob):
+        return LazySave(self, blob)
+
+    def loads(self, blob):
+        """dict modifiable depuis l'un ou l'autre format."""
+        return self.decode(blob).to_dict() if is_binary(blob) else json.loads(blob)
+
+    def dumps(self, state, fmt):
+        if fmt == "binary":
+            return self.encode(state)
+        return json.dumps(state, ensure_ascii=False, indent=2).encode()
+
+
+def convert(saves_dir, codec, fmt):
+    """Réécrit toutes les sauvegardes de `saves_dir` au format `fmt`, mtime (= ordre) conservé."""
+    from save_layout import ShardedLayout, save_key
+    from storage import atomic_write_bytes, locked
+    locks = ShardedLayout(os.path.join(saves_dir, ".locks"))
+    target = EXTENSIONS[fmt]
+    converted = 0
+    for directory, dirs, files in os.walk(saves_dir):
+        dirs[:] = [d for d in dirs if d not in ("events", ".locks")]
+        for name in sorted(files):
+            stem, ext = os.path.splitext(name)
+            if ext not in EXTENSIONS.values() or ext == target or name.startswith("."):
+                continue
+            # Éclats : le fichier porte déjà le hash ; dossier plat (pas encore migré) : le nom du joueur
+            key = save_key(stem) if directory == saves_dir else stem
+            src = os.path.join(directory, name)
+            with locked(locks.key_path(key, ".lock", create=True)):
+                stamp = os.stat(src).st_mtime_ns
+                with open(src, "rb") as f:
+                    blob = codec.dumps(codec.loads(f.read()), fmt)
+                dst = os.path.join(directory, stem + target)
+                atomic_write_bytes(dst, blob)
+                os.utime(dst, ns=(stamp, stamp))
+                os.remove(src)
+            converted += 1
+    return converted
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ("to-binary", "to-json"):
+        sys.exit(__doc__)
+    from Qwen_python_20260113_llvcbh3vy import DEFAULT_CONFIG, save_codec
+    saves_dir = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_CONFIG["SAVES_DIR"]
+    print(f"{convert(saves_dir, save_codec, sys.argv[1][3:])} sauvegarde(s) converties")
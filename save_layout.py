@@ -0,0 +1,156 @@
+"""Arborescence des sauvegardes en éclats hachés, index inverse et migration de l'ancien dossier plat.
+
+    pokemon_saves/ab/cd/<sha256(user)>.json     (ou .sav)
+    pokemon_saves/events/ab/cd/<sha256>.log
+    pokemon_saves/.locks/ab/cd/<sha256>.lock
+    pokemon_saves/index.db                      hash -> nom de joueur
+
+Deux niveaux de 256 dossiers : même avec des millions de joueurs, chaque dossier
+reste petit. Le nom de joueur ne sert plus jamais de nom de fichier (pas de
+``../`` ni de caractère interdit) ; l'index permet de retrouver le joueur d'un
+fichier (sauvegardes, audit, classement).
+
+    python save_layout.py whois <hash>      # joueur d'un fichier de sauvegarde
+    python save_layout.py list              # hash et joueur de toutes les sauvegardes
+"""
+import hashlib, logging, os, sys, threading
+from storage import SQLiteConnections, atomic_write_bytes
+
+log = logging.getLogger(__name__)
+
+
+def save_key(user):
+    return hashlib.sha256(user.encode("utf-8")).hexdigest()
+
+
+class ShardedLayout:
+    def __init__(self, root):
+        self.root = root
+        self._made = set()  # dossiers d'éclats déjà créés par ce processus
+
+    def path(self, user, suffix, create=False):
+        return self.key_path(save_key(user), suffix, create)
+
+    def key_path(self, key, suffix, create=False):
+        directory = os.path.join(self.root, key[:2], key[2:4])
+        if create and directory not in self._made:
+            os.makedirs(directory, exist_ok=True)
+            self._made.add(directory)
+        return os.path.join(directory, key + suffix)
+
+
+class SaveIndex:
+    """Index inverse hash -> joueur (SQLite, une connexion par thread)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._db = SQLiteConnections(path)
+        self._known = set()
+        with self._db() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS saves (key TEXT PRIMARY KEY, username TEXT NOT NULL)")
+
+    def add(self, user):
+        if user in self._known:
+            return
+        with self._db() as db:
+            db.execute("INSERT OR IGNORE INTO saves (key, username) VALUES (?, ?)", (save_key(user), user))
+        self._known.add(user)
+
+    def user_for(self, key):
+        row = self._db().execute("SELECT username FROM saves WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def users(self):
+        return [row[0] for row in self._db().execute("SELECT username FROM saves ORDER BY username")]
+
+    def items(self):
+        return self._db().execute("SELECT key, username FROM saves ORDER BY key").fetchall()
+
+
+def _flat_files(directory, suffixes):
+    """(joueur, chemin, suffixe) des fichiers de l'ancien format plat de `directory`."""
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if not entry.is_file() or entry.name.startswith("."):
+            continue
+        for suffix in suffixes:
+            if entry.name.endswith(suffix):
+                yield entry.name[:-len(suffix)], entry.path, suffix
+                break
+
+
+def migrate_flat(backends):
+    """Déplace les sauvegardes et journaux plats `<user>.*` vers les éclats. Sûr pendant que
+    le jeu tourne (verrou du joueur) et entre workers qui migrent en même temps.
+    Retourne le nombre de fichiers déplacés."""
+    moved = 0
+    # .archive.log avant .log : le suffixe le plus long doit gagner
+    for directory, layout, suffixes in (
+            (backends.saves_dir, backends.layout, tuple(backends.save_suffixes)),
+            (backends.events.legacy_dir, backends.events.layout, (".archive.log", ".log"))):
+        for user, src, suffix in _flat_files(directory, suffixes):
+            with backends.lock(user):
+                if not os.path.exists(src):
+                    continue  # déjà migré par un autre worker
+                dst = layout.path(user, suffix, create=True)
+                if suffix in backends.save_suffixes:
+                    try:
+                        newer = os.stat(dst).st_mtime_ns >= os.stat(src).st_mtime_ns
+                    except FileNotFoundError:
+                        newer = False
+                    if newer:
+                        os.remove(src)  # une sauvegarde plus récente a déjà été écrite en éclat
+                    else:
+                        os.replace(src, dst)  # rename : mtime (ordre des sauvegardes) conservé
+                else:
+                    # Journal : les anciens événements précèdent ceux ajoutés depuis le démarrage
+                    with open(src, "rb") as f:
+                        old = f.read()
+                    try:
+                        with open(dst, "rb") as f:
+                            new = f.read()
+                    except FileNotFoundError:
+                        new = b""
+                    atomic_write_bytes(dst, old + new)
+                    os.remove(src)
+                backends.index.add(user)
+            moved += 1
+    # Anciens verrous plats (.locks/<user>.lock) : plus utilisés
+    for user, path, _ in _flat_files(backends.locks_dir, (".lock",)):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    return moved
+
+
+def start_migration(backends):
+    """Migration en tâche de fond ; `backends.legacy` repasse à False une fois le dossier plat vide."""
+    def run():
+        try:
+            moved = migrate_flat(backends)
+        except Exception:
+            log.exception("Migration des sauvegardes plates interrompue")
+            return
+        if moved:
+            log.info("%d fichier(s) de sauvegarde migré(s) vers les éclats", moved)
+        backends.legacy = backends.events.legacy = False
+
+    thread = threading.Thread(target=run, name="save-layout-migration", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    from Qwen_python_20260113_llvcbh3vy import DEFAULT_CONFIG
+    index = SaveIndex(os.path.join(DEFAULT_CONFIG["SAVES_DIR"], "index.db"))
+    if sys.argv[1:2] == ["whois"] and len(sys.argv) == 3:
+        print(index.user_for(sys.argv[2]) or "inconnu")
+    elif sys.argv[1:] == ["list"]:
+        for key, user in index.items():
+            print(key, user)
+    else:
+        sys.exit(__doc__)
@@ -0,0 +1,75 @@
+"""Sauvegarde write-behind : les états modifiés sont marqués sales puis écrits par lots.
+
+Un thread de fond vide les états sales toutes les `interval` secondes, ou dès
+que `threshold` joueurs attendent. Un crash perd au plus un intervalle.
+"""
+import atexit, logging, threading, time
+
+log = logging.getLogger(__name__)
+
+
+class WriteBehindSaver:
+    """`write(user, state, stamp)` reçoit l'instant (time_ns) où l'état a été marqué."""
+
+    def __init__(self, write, interval=5.0, threshold=100):
+        self.write = write
+        self.interval = interval
+        self.threshold = threshold
+        self._dirty = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="write-behind-saver", daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+        return self
+
+    def mark_dirty(self, user, state):
+        # L'appelant cède l'état : il ne doit plus le muter après cet appel
+        with self._lock:
+            self._dirty[user] = (state, time.time_ns())
+            full = len(self._dirty) >= self.threshold
+        if full:
+            self._wake.set()
+
+    def pending(self, user):
+        """Dernier état pas encore écrit sur disque pour ce joueur, sinon None."""
+        with self._lock:
+            entry = self._dirty.get(user) or self._inflight.get(user)
+            return entry[0] if entry else None
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._dirty) + len(self._inflight)
+
+    def request_flush(self):
+        self._wake.set()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                batch, self._dirty = self._dirty, {}
+                self._inflight = batch
+            try:
+                for user, (state, stamp) in batch.items():
+                    try:
+                        self.write(user, state, stamp)
+                    except Exception:
+                        log.exception("Échec de sauvegarde pour %s", user)
+                        with self._lock:
+                            self._dirty.setdefault(user, (state, stamp))
+            finally:
+                with self._lock:
+                    self._inflight = {}
+            return len(batch)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
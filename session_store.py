@@ -0,0 +1,129 @@
+"""Sessions côté serveur : le cookie ne contient plus qu'un identifiant de session.
+
+L'état de jeu (game_state, combat en cours, langue...) reste dans un backend
+interchangeable : MemoryBackend (processus unique) ou SQLiteBackend (fichier,
+partagé entre workers). Taille de requête/réponse constante quelle que soit
+la collection.
+"""
+import json, secrets, threading, time
+from contextlib import nullcontext
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+from storage import Every, SQLiteConnections
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.old_sid = None
+
+    def regenerate(self):
+        """Nouvel identifiant (à la connexion) : un cookie posé par un tiers avant le login ne
+        donne pas accès à la session authentifiée. L'ancienne entrée est supprimée à l'enregistrement."""
+        self.old_sid = self.old_sid or self.sid
+        self.sid = secrets.token_urlsafe(24)
+        self.new = True
+        self.modified = True
+
+
+class MemoryBackend:
+    PURGE_EVERY = 1000  # écritures entre deux purges des sessions expirées
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+        self._purge_due = Every(self.PURGE_EVERY)
+
+    def get(self, sid):
+        entry = self._data.get(sid)
+        if entry is None or entry[0] < time.time():
+            return None
+        return entry[1]
+
+    def set(self, sid, blob, ttl):
+        now = time.time()
+        with self._lock:
+            self._data[sid] = (now + ttl, blob)
+            if self._purge_due():
+                self._data = {k: entry for k, entry in self._data.items() if entry[0] >= now}
+
+    def delete(self, sid):
+        with self._lock:
+            self._data.pop(sid, None)
+
+
+class SQLiteBackend:
+    PURGE_EVERY = 1000  # écritures entre deux purges des sessions expirées
+
+    def __init__(self, path):
+        self.path = path
+        self._db = SQLiteConnections(path)
+        self._purge_due = Every(self.PURGE_EVERY)
+        with self._db() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS sessions (sid TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL)")
+
+    def get(self, sid):
+        row = self._db().execute("SELECT data FROM sessions WHERE sid = ? AND expires >= ?",
+                                 (sid, time.time())).fetchone()
+        return row[0] if row else None
+
+    def set(self, sid, blob, ttl):
+        now = time.time()
+        with self._db() as db:
+            db.execute("INSERT OR REPLACE INTO sessions (sid, data, expires) VALUES (?, ?, ?)", (sid, blob, now + ttl))
+            if self._purge_due():
+                db.execute("DELETE FROM sessions WHERE expires < ?", (now,))
+
+    def delete(self, sid):
+        with self._db() as db:
+            db.execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+
+def make_backend(name, path=None):
+    if name == "memory":
+        return MemoryBackend()
+    if name == "sqlite":
+        return SQLiteBackend(path)
+    raise ValueError(f"Backend de session inconnu: {name!r}")
+
+
+class ServerSessionInterface(SessionInterface):
+    def __init__(self, backend, timer=None):
+        self.backend = backend
+        # timer(nom) -> context manager qui mesure "session_load" / "session_save"
+        self.timer = timer or (lambda name: nullcontext())
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            with self.timer("session_load"):
+                blob = self.backend.get(sid)
+                data = json.loads(blob) if blob is not None else None
+            if data is not None:
+                return ServerSession(data, sid=sid)
+        return ServerSession(sid=secrets.token_urlsafe(24), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if session.old_sid is not None:
+            self.backend.delete(session.old_sid)
+        if not session:
+            if session.modified:
+                self.backend.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        if session.modified:
+            ttl = app.permanent_session_lifetime.total_seconds()
+            with self.timer("session_save"):
+                self.backend.set(session.sid, json.dumps(dict(session), ensure_ascii=False), ttl)
+        if session.new:
+            response.set_cookie(name, session.sid, expires=self.get_expiration_time(app, session),
+                                httponly=self.get_cookie_httponly(app), domain=domain, path=path,
+                                secure=self.get_cookie_secure(app), samesite=self.get_cookie_samesite(app))
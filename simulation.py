@@ -0,0 +1,103 @@
+"""Simulateur de combats headless, vectorisé avec NumPy, pour équilibrer les boss.
+
+Rejoue les règles du moteur de combat (combat.py) sur des millions de combats à la fois
+et donne, par boss et par Pokémon joueur : taux de victoire, tours pour tuer
+le boss et gain moyen (récompense si victoire, 25€ sinon).
+
+    python simulation.py --fights 1000000 --level 3 --heal-below 0.3 --team Pikachu,Lucario
+"""
+import argparse
+import numpy as np
+import game_data
+from combat import BOSS_HEAL_CHANCE, CRIT_CHANCE, CRIT_MULT, DEFEAT_REWARD, DMG_SPREAD, HEAL_RATIO
+
+
+def player_pokemon(species, niveau=1):
+    """Pokémon tel que sorti d'un booster, puis monté au niveau demandé."""
+    pv = species.pv + (niveau - 1) * 10
+    return {"nom": species.nom, "pv": pv, "pv_max": pv, "attaque": species.booster_atk + (niveau - 1) * 3}
+
+
+def _damage(rng, atk):
+    dmg = rng.integers(atk - DMG_SPREAD, atk + DMG_SPREAD + 1)
+    return np.where(rng.random(dmg.shape) < CRIT_CHANCE / 100, (dmg * CRIT_MULT).astype(np.int64), dmg)
+
+
+def simulate(boss, pokemon, n, rng, heal_below=0.0, max_turns=500):
+    """Simule n combats pokemon vs boss (game_data.Boss) ; soigne si PV < heal_below * pv_max, sinon attaque."""
+    boss_pv_base = np.array([s.pv + boss.niveau * 10 for s in boss.pokemon])
+    boss_atk_base = np.array([s.attaque + boss.niveau * 2 for s in boss.pokemon])
+    choice = rng.integers(0, len(boss.pokemon), n)
+    boss_pv, boss_atk = boss_pv_base[choice], boss_atk_base[choice]
+    boss_pv_max = boss_pv.copy()
+    pv_max = pokemon["pv_max"]
+    pv = np.full(n, pokemon["pv"], dtype=np.int64)
+    atk = np.full(n, pokemon["attaque"], dtype=np.int64)
+    heal = int(pv_max * HEAL_RATIO)
+    turns = np.zeros(n, dtype=np.int64)
+
+    idx = np.arange(n)  # combats encore en cours
+    for _ in range(max_turns):
+        if not idx.size:
+            break
+        p_pv, b_pv = pv[idx], boss_pv[idx]
+        # Tour du joueur
+        heals = p_pv < heal_below * pv_max
+        b_pv = b_pv - np.where(heals, 0, _damage(rng, atk[idx]))
+        p_pv = np.where(heals, np.minimum(pv_max, p_pv + heal), p_pv)
+        # Tour du boss (s'il est encore debout)
+        alive = b_pv > 0
+        b_heals = alive & (rng.random(idx.size) < BOSS_HEAL_CHANCE / 100)
+        b_max = boss_pv_max[idx]
+        b_pv = np.where(b_heals, np.minimum(b_max, b_pv + (b_max * HEAL_RATIO).astype(np.int64)), b_pv)
+        p_pv = p_pv - np.where(alive & ~b_heals, _damage(rng, boss_atk[idx]), 0)
+
+        pv[idx], boss_pv[idx] = p_pv, b_pv
+        turns[idx] += 1
+        idx = idx[(p_pv > 0) & (b_pv > 0)]
+
+    won = boss_pv <= 0
+    lost = (pv <= 0) & ~won
+    return {
+        "win_rate": float(won.mean()),
+        "turns": float(turns.mean()),
+        "turns_to_kill": float(turns[won].mean()) if won.any() else float("nan"),
+        "unfinished": int(idx.size),
+        "earnings": float(won.mean() * boss.recompense + lost.mean() * DEFEAT_REWARD),
+    }
+
+
+def run(game, fights, niveau=1, heal_below=0.0, team=None, seed=None):
+    rng = np.random.default_rng(seed)
+    results = {}
+    for boss in game.bosses:
+        print(f"\n=== {boss.nom} (niv. {boss.niveau}, {boss.recompense}€) ===")
+        print(f"{'Pokémon':<12}{'victoire':>10}{'tours':>8}{'tours/kill':>12}{'gain moyen':>14}")
+        for species in game.species:
+            nom = species.nom
+            r = simulate(boss, player_pokemon(species, niveau), fights, rng, heal_below)
+            results[boss.nom, nom] = r
+            print(f"{nom:<12}{r['win_rate']:>10.1%}{r['turns']:>8.1f}{r['turns_to_kill']:>12.1f}{r['earnings']:>13.1f}€")
+        if team:
+            best = max(team, key=lambda nom: results[boss.nom, nom]["earnings"])
+            r = results[boss.nom, best]
+            print(f"{'équipe':<12}{r['win_rate']:>10.1%}{r['turns']:>8.1f}{r['turns_to_kill']:>12.1f}{r['earnings']:>13.1f}€  ({best})")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fights", type=int, default=100_000, help="combats par couple boss/Pokémon")
+    parser.add_argument("--level", type=int, default=1, help="niveau des Pokémon joueur")
+    parser.add_argument("--heal-below", type=float, default=0.0, help="soigne sous cette fraction de PV (0 = attaque toujours)")
+    parser.add_argument("--team", help="équipe à évaluer, ex. Pikachu,Lucario (meilleur choix par boss)")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--data", help="fichier de données de jeu JSON/TOML (voir game_data.py)")
+    args = parser.parse_args(argv)
+
+    team = args.team.split(",") if args.team else None
+    run(game_data.load(args.data), args.fights, args.level, args.heal_below, team, args.seed)
+
+
+if __name__ == "__main__":
+    main()
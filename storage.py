@@ -0,0 +1,97 @@
+"""Écritures de fichiers sûres entre processus : écriture atomique durable et verrous par clé.
+
+atomic_write_bytes / _text : fichier temporaire + fsync + rename + fsync du dossier, donc
+jamais de fichier tronqué, même après un crash ou une coupure.
+locked : verrou consultatif (flock) sur un fichier .lock, partagé par tous les
+workers d'une même machine. Sans fcntl (Windows), le verrou ne vaut que pour
+le processus courant.
+SQLiteConnections : les bases SQLite partagées entre workers (comptes, sessions,
+index, classements), une connexion par thread.
+"""
+import itertools, json, os, sqlite3, tempfile, threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+_local_locks = defaultdict(threading.Lock)
+
+
+def fsync_dir(path):
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write_bytes(path, data):
+    directory = os.path.dirname(path) or "."
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    fsync_dir(directory)
+
+
+def atomic_write_text(path, text):
+    atomic_write_bytes(path, text.encode('utf-8'))
+
+
+def atomic_write_json(path, data, **dump_kwargs):
+    atomic_write_text(path, json.dumps(data, **dump_kwargs))
+
+
+@contextmanager
+def locked(lock_path):
+    """Verrou exclusif sur lock_path (créé au besoin), tenu pendant le bloc."""
+    if fcntl is None:
+        with _local_locks[lock_path]:
+            yield
+        return
+    with open(lock_path, "a+b") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class SQLiteConnections:
+    """``db = conns()`` : la connexion du thread courant (sqlite3 refuse le partage entre
+    threads), ouverte au premier appel en WAL + synchronous=NORMAL."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def __call__(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+
+class Every:
+    """Appelable qui vaut True un appel sur `n` (purges périodiques), sûr entre threads."""
+
+    def __init__(self, n):
+        self.n = n
+        self._count = itertools.count(1)
+
+    def __call__(self):
+        return next(self._count) % self.n == 0
@@ -0,0 +1,48 @@
+"""Adaptateur WSGI -> ASGI (asgi.py) : corps de requête sans content-length."""
+import asyncio, os, sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Qwen_python_20260113_llvcbh3vy import create_app
+
+
+@pytest.fixture
+def adapter(tmp_path, monkeypatch):
+    # asgi.py crée son app à l'import : fichiers par défaut dans le dossier temporaire
+    monkeypatch.chdir(tmp_path)
+    from asgi import WSGIToASGI
+    config = {"USERS_FILE": str(tmp_path / "users.json"), "USERS_DB": str(tmp_path / "users.db"),
+              "SESSIONS_DB": str(tmp_path / "sessions.db"), "SAVES_DIR": str(tmp_path / "saves"),
+              "PASSWORD_ITERATIONS": 1000, "PRERENDER_PAGES": False}
+    return WSGIToASGI(create_app(config), threads=2)
+
+
+def call(app, method, path, headers, chunks):
+    messages = [{"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+                for i, chunk in enumerate(chunks)]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "query_string": b"", "http_version": "1.1",
+             "headers": [(k.encode(), v.encode()) for k, v in headers]}
+    asyncio.run(app(scope, receive, send))
+    return sent[0]["status"]
+
+
+@pytest.mark.parametrize("framing", ["content-length", "chunked"])
+def test_form_post_reaches_the_view(adapter, framing):
+    body = b"username=sacha&password=pw"
+    headers = [("content-type", "application/x-www-form-urlencoded")]
+    if framing == "chunked":
+        headers.append(("transfer-encoding", "chunked"))
+        chunks = [body[:10], body[10:]]
+    else:
+        headers.append(("content-length", str(len(body))))
+        chunks = [body]
+    assert call(adapter, "POST", "/signup", headers, chunks) == 302
@@ -0,0 +1,53 @@
+"""Les boosters suivent-ils les taux configurés (50/20/20/8/2 par palier) ? Test du χ² seedé."""
+import math, os, sys
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from drops import DropTable
+from game_data import load
+
+DRAWS, SEED, ALPHA = 50_000, 12345, 0.001
+
+
+def chi2_sf(x, df):
+    """P(χ²(df) >= x), forme exacte pour df entier."""
+    if df % 2 == 0:
+        term = total = 1.0
+        for i in range(1, df // 2):
+            term *= x / 2 / i
+            total += term
+        return math.exp(-x / 2) * total
+    term, total = math.sqrt(2 * x / math.pi) * math.exp(-x / 2), 0.0
+    for i in range(1, (df - 1) // 2 + 1):
+        total += term
+        term *= x / (2 * i + 1)
+    return math.erfc(math.sqrt(x / 2)) + total
+
+
+def chi2_pvalue(observed, expected):
+    return chi2_sf(sum((observed.get(k, 0) - e) ** 2 / e for k, e in expected.items()), len(expected) - 1)
+
+
+def test_chi2_sf_known_values():
+    # Quantiles à 95 % de la table du χ²
+    for df, x in ((1, 3.841), (2, 5.991), (4, 9.488), (7, 14.067)):
+        assert abs(chi2_sf(x, df) - 0.05) < 1e-3
+
+
+def test_booster_rates():
+    game = load()
+    draws = DropTable(game.booster.probabilities, seed=SEED).draw_many(DRAWS)
+    per_species = Counter(s.nom for s in draws)
+    tier_of = {s.nom: i for i, (group, _) in enumerate(game.booster_tiers) for s in group}
+    per_tier = Counter(tier_of[nom] for nom in per_species.elements())
+    total_rate = sum(taux for _, taux in game.booster_tiers)
+
+    assert [taux for _, taux in game.booster_tiers] == [50, 20, 20, 8, 2]
+    assert chi2_pvalue(per_tier, {i: taux / total_rate * DRAWS
+                                  for i, (_, taux) in enumerate(game.booster_tiers)}) >= ALPHA
+    assert chi2_pvalue(per_species, {s.nom: p * DRAWS for s, p in game.booster.probabilities.items()}) >= ALPHA
+
+
+def test_skewed_table_is_rejected():
+    draws = DropTable({"a": 60, "b": 40}, seed=SEED).draw_many(DRAWS)
+    assert chi2_pvalue(Counter(draws), {"a": DRAWS / 2, "b": DRAWS / 2}) < ALPHA
@@ -0,0 +1,98 @@
+"""Rejeu du journal d'événements et reprise après un crash (events.py, Backends._read_save)."""
+import os, sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import events
+from Qwen_python_20260113_llvcbh3vy import create_app
+
+
+@pytest.fixture
+def config(tmp_path):
+    # Saver qui n'écrit jamais de lui-même : seul le journal survit au "crash"
+    return {"USERS_FILE": str(tmp_path / "users.json"), "USERS_DB": str(tmp_path / "users.db"),
+            "SESSIONS_DB": str(tmp_path / "sessions.db"), "SAVES_DIR": str(tmp_path / "saves"),
+            "SAVE_INTERVAL": 3600, "SAVE_BATCH": 1000, "PASSWORD_ITERATIONS": 1000, "PRERENDER_PAGES": False}
+
+
+def player(app, user, signup=False):
+    client = app.test_client()
+    if signup:
+        assert client.post("/api/v1/signup", json={"username": user, "password": "pw"}).status_code == 201
+    assert client.post("/api/v1/login", json={"username": user, "password": "pw"}).status_code == 200
+    return client
+
+
+def pokemon(nom):
+    return {"nom": nom, "pv": 45, "pv_max": 45, "attaque": 10, "rarete": "Commun", "niveau": 1, "xp": 0}
+
+
+def test_apply_skips_events_that_no_longer_apply():
+    state = {"argent": 0, "boss_actuel": 0, "collection": [pokemon("A"), pokemon("B"), pokemon("C")]}
+    # Ancien format (indice seul), écrit deux fois par deux clients depuis le même état
+    tail = [{"t": 1, "e": "sell", "idx": 2, "argent": 10}, {"t": 2, "e": "sell", "idx": 2, "argent": 10},
+            {"t": 3, "e": "fight_turn", "idx": 5, "action": "attack", "pv": 1}, {"t": 4, "e": "inconnu"},
+            {"t": 5, "e": "heal_team", "argent": 5}]
+    events.apply(state, tail)
+    assert [p["nom"] for p in state["collection"]] == ["A", "B"]
+    assert state["argent"] == 5
+
+
+def test_booster_and_sell_replay_is_idempotent():
+    state = {"argent": 150, "boss_actuel": 0, "collection": []}
+    tail = [{"t": 1, "e": "booster", "argent": 100, "added": [pokemon("A")], "collection": [pokemon("A")]},
+            {"t": 2, "e": "sell", "idx": 0, "argent": 110, "collection": []}]
+    once = events.apply({**state, "collection": []}, tail)
+    twice = events.apply({**state, "collection": []}, tail + tail)
+    assert once == twice == {"argent": 110, "boss_actuel": 0, "collection": []}
+
+
+def test_crash_recovery_replays_the_tail(config):
+    app = create_app(config)
+    client = player(app, "sacha", signup=True)
+    for _ in range(3):
+        assert client.post("/api/v1/booster").status_code == 200
+    assert client.post("/api/v1/sell", json={"index": 1}).status_code == 200
+    assert client.post("/api/v1/heal_team").status_code == 200
+    state = client.get("/api/v1/state").get_json()["state"]
+
+    # Redémarrage : rien n'a été sauvegardé, l'état vient du journal seul
+    assert create_app(config).extensions["pokemon"].read_save("sacha") == state
+
+    # Instantané écrit : les événements qu'il contient ne sont pas rejoués une seconde fois
+    app.extensions["pokemon"].saver.flush()
+    assert create_app(config).extensions["pokemon"].read_save("sacha") == state
+
+
+def test_concurrent_sells_do_not_lock_the_player_out(config):
+    app = create_app(config)
+    first = player(app, "ondine", signup=True)
+    for _ in range(3):
+        first.post("/api/v1/booster")
+    second = player(app, "ondine")
+    assert first.post("/api/v1/sell", json={"index": 2}).status_code == 200
+    assert second.post("/api/v1/sell", json={"index": 2}).status_code == 200
+
+    restarted = create_app(config)
+    assert len(restarted.extensions["pokemon"].read_save("ondine")["collection"]) == 2
+    player(restarted, "ondine")
+
+
+def test_save_cache_sees_other_workers(config):
+    first, second = create_app(config), create_app(config)
+    client = player(first, "pierre", signup=True)
+    client.post("/api/v1/booster")
+    first.extensions["pokemon"].saver.flush()
+    reader = second.extensions["pokemon"]
+    cached = reader.read_save("pierre")
+    cached["argent"] = -1  # copie : le cache n'est pas touché
+    assert reader.read_save("pierre")["argent"] != -1
+    assert reader.save_cache.stats()["hits"] == 1
+
+    # Événement puis instantané écrits par l'autre worker : l'entrée en cache est périmée
+    client.post("/api/v1/heal_team")
+    assert reader.read_save("pierre") == client.get("/api/v1/state").get_json()["state"]
+    client.post("/api/v1/booster")
+    first.extensions["pokemon"].saver.flush()
+    assert reader.read_save("pierre") == client.get("/api/v1/state").get_json()["state"]
@@ -0,0 +1,60 @@
+"""Combats et saisies de l'API : pas de récompense sans combat terminé, paramètres invalides refusés."""
+import os, sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import combat as engine
+from Qwen_python_20260113_llvcbh3vy import GAME, create_app
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = create_app({"USERS_FILE": str(tmp_path / "users.json"), "USERS_DB": str(tmp_path / "users.db"),
+                      "SESSIONS_DB": str(tmp_path / "sessions.db"), "SAVES_DIR": str(tmp_path / "saves"),
+                      "PASSWORD_ITERATIONS": 1000, "PRERENDER_PAGES": False})
+    client = app.test_client()
+    assert client.post("/api/v1/signup", json={"username": "sacha", "password": "pw"}).status_code == 201
+    assert client.post("/api/v1/login", json={"username": "sacha", "password": "pw"}).status_code == 200
+    assert client.post("/api/v1/booster").status_code == 200
+    return client
+
+
+def test_unfinished_fight_is_not_settled(client):
+    argent = client.get("/api/v1/state").get_json()["state"]["argent"]
+    for _ in range(3):
+        client.post("/fight", data={"pokemon_idx": "0"})
+        assert client.get("/fight_result").headers["Location"].endswith("/fight_action")
+    state = client.get("/api/v1/state").get_json()
+    assert state["state"]["argent"] == argent and state["combat"] is not None
+
+
+def test_finish_refuses_a_running_fight():
+    boss = GAME.bosses[0]
+    pokemon = {"nom": "A", "pv": 45, "pv_max": 45, "attaque": 10, "niveau": 1, "xp": 0}
+    with pytest.raises(ValueError):
+        engine.finish(engine.start(boss, pokemon, 0, seed=1), pokemon, boss)
+
+
+def test_auto_fight_always_ends():
+    boss = GAME.bosses[-1]
+    # Ni l'un ni l'autre ne peut l'emporter : abandon après AUTO_MAX_TURNS
+    pokemon = {"nom": "A", "pv": 10_000, "pv_max": 10_000, "attaque": 0, "niveau": 1, "xp": 0}
+    state = engine.act(engine.start(boss, pokemon, 0, seed=1), "auto", 0.5)
+    assert state.finished and not state.won
+
+
+def test_unknown_action_is_rejected(client):
+    assert client.post("/api/v1/fight", json={"pokemon_idx": 0}).status_code == 200
+    before = client.get("/api/v1/state").get_json()["combat"]
+    response = client.post("/api/v1/fight_action", json={"action": "dance"})
+    assert response.status_code == 400 and response.get_json()["error"] == "bad_param"
+    assert client.post("/fight_action", data={"action": "dance"}).status_code == 200
+    assert client.get("/api/v1/state").get_json()["combat"] == before
+
+
+@pytest.mark.parametrize("body", [{}, {"username": "ondine"}, {"username": "", "password": "pw"},
+                                  {"username": 5, "password": "pw"}])
+def test_signup_requires_username_and_password(client, body):
+    response = client.post("/api/v1/signup", json=body)
+    assert response.status_code == 400 and response.get_json()["error"] == "bad_param"
@@ -0,0 +1,75 @@
+"""Comptes joueurs stockés dans SQLite : lookup O(1) par username, inserts unitaires.
+
+Migration ponctuelle depuis l'ancien pokemon_users.json :
+
+    python user_store.py pokemon_users.json pokemon_users.db
+"""
+import json, os, sys
+from collections.abc import MutableMapping
+from storage import SQLiteConnections
+
+
+class UserStore(MutableMapping):
+    """Vue dict-like sur la table users ; chaque accès touche une seule ligne."""
+
+    def __init__(self, path):
+        self.path = path
+        self._db = SQLiteConnections(path)
+        with self._db() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS users (username TEXT PRIMARY KEY, data TEXT NOT NULL)")
+
+    def __getitem__(self, user):
+        row = self._db().execute("SELECT data FROM users WHERE username = ?", (user,)).fetchone()
+        if row is None:
+            raise KeyError(user)
+        return json.loads(row[0])
+
+    def __contains__(self, user):
+        return self._db().execute("SELECT 1 FROM users WHERE username = ?", (user,)).fetchone() is not None
+
+    def __setitem__(self, user, record):
+        with self._db() as db:
+            db.execute("INSERT OR REPLACE INTO users (username, data) VALUES (?, ?)",
+                       (user, json.dumps(record, ensure_ascii=False)))
+
+    def __delitem__(self, user):
+        with self._db() as db:
+            if db.execute("DELETE FROM users WHERE username = ?", (user,)).rowcount == 0:
+                raise KeyError(user)
+
+    def __iter__(self):
+        return (row[0] for row in self._db().execute("SELECT username FROM users").fetchall())
+
+    def __len__(self):
+        return self._db().execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def add(self, user, record):
+        """Insère un nouveau compte ; False si le nom est déjà pris (atomique)."""
+        with self._db() as db:
+            cur = db.execute("INSERT OR IGNORE INTO users (username, data) VALUES (?, ?)",
+                             (user, json.dumps(record, ensure_ascii=False)))
+        return cur.rowcount == 1
+
+    def migrate_json(self, json_path):
+        """Importe l'ancien fichier JSON puis le renomme en .migrated. Retourne le nombre de comptes.
+        Appelé par chaque worker au démarrage : celui qui arrive après le renommage par un autre
+        ne trouve plus le fichier, et l'import en double est sans effet (INSERT OR IGNORE)."""
+        try:
+            with open(json_path, encoding='utf-8') as f:
+                users = json.load(f)
+        except FileNotFoundError:
+            return 0
+        with self._db() as db:
+            db.executemany("INSERT OR IGNORE INTO users (username, data) VALUES (?, ?)",
+                           [(u, json.dumps(r, ensure_ascii=False)) for u, r in users.items()])
+        try:
+            os.replace(json_path, json_path + ".migrated")
+        except FileNotFoundError:
+            pass  # déjà renommé par un autre worker
+        return len(users)
+
+
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else "pokemon_users.json"
+    dst = sys.argv[2] if len(sys.argv) > 2 else "pokemon_users.db"
+    print(f"{UserStore(dst).migrate_json(src)} compte(s) migré(s) vers {dst}")
@@ -0,0 +1,24 @@
+"""Point d'entrée WSGI de production.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Mode multi-processus (pré-fork) réglé par variables d'environnement :
+
+    POKEMON_WORKERS          nombre de processus (défaut : 2 x CPU + 1)
+    POKEMON_THREADS          threads par processus (défaut : 4)
+    POKEMON_BIND             adresse d'écoute (défaut : 0.0.0.0:8000)
+    POKEMON_SECRET_KEY       clé secrète Flask, à définir en production
+    POKEMON_SESSION_BACKEND  "sqlite" (obligatoire avec plusieurs workers) ou "memory"
+    POKEMON_WORKER_CLASS     "gthread" (ce module) ou "asgi" (voir asgi.py)
+
+Chaque worker crée sa propre app : sessions et comptes sont partagés via SQLite,
+les sauvegardes via pokemon_saves/. Les caches, la file write-behind et le
+classement en mémoire restent propres à chaque processus, mais chaque action est
+ajoutée aussitôt au journal d'événements du joueur (events.py) : un joueur qui se
+reconnecte sur un autre worker retrouve son état exact (dernière sauvegarde +
+événements suivants). Seul le classement vu depuis les autres workers peut avoir
+jusqu'à POKEMON_SAVE_INTERVAL secondes de retard.
+"""
+from Qwen_python_20260113_llvcbh3vy import create_app
+
+app = create_app()